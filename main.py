@@ -1,10 +1,26 @@
 from mcp.server.fastmcp import FastMCP
-from typing import Optional, Dict, List, Any
-import requests
-import base64
+from typing import Optional, Dict, Iterable, Iterator, List, Any, MutableMapping, Union
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, fields, replace
+from datetime import datetime
+import anthropic
+import asyncio
+import atexit
+import copy
+import dbm
+import functools
+import hashlib
+import inspect
+import itertools
+import httpx
 import json
+import orjson
 import os
-from urllib.parse import urlparse
+import pathspec
+import re
+import shelve
+import time
+from urllib.parse import quote
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -13,19 +29,718 @@ load_dotenv()
 # Create the MCP server
 mcp = FastMCP("GitHub Code Review MCP")
 
+@dataclass(frozen=True, slots=True)
+class RepoSummary:
+    """Summary row for a reviewed repository, as returned by list_reviewed_repos"""
+    repo: str
+    review_date: str
+    focus_areas: str
+
+
+@dataclass(slots=True)
+class FileEntry:
+    """Fetched content of a repository file"""
+    path: str
+    content: str
+    size: int
+    is_binary: bool = False
+    too_large: bool = False
+    # Set by prepare_code_for_review when identical files are sent to Claude once
+    duplicate_of: Optional[str] = None
+    also_at: List[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True, slots=True)
+class Dependency:
+    """Package listed in a dependency manifest"""
+    name: str
+    version: str
+    dev: bool = False
+
+
+@dataclass(slots=True)
+class SecurityFinding:
+    """Line of code matching one of the security patterns"""
+    type: str
+    path: str
+    line: int
+    match: str
+
+
+@dataclass(slots=True)
+class ReviewEntry:
+    """Stored review data for a repository"""
+    repo_info: Dict[str, Any]
+    review_results: Dict[str, Any]
+    focus_areas: Optional[str]
+    review_date: str
+    code_content: Dict[str, FileEntry] = field(default_factory=dict)
+    # Commit the review was generated for, used to skip re-reviewing an unchanged repository
+    head_sha: Optional[str] = None
+    # Claude model that generated the review; None for the placeholder returned without an API key
+    model: Optional[str] = None
+    quality_metrics: Optional[Dict[str, Any]] = None
+    vulnerabilities: List[Dict[str, Any]] = field(default_factory=list)
+    performance_issues: List[Dict[str, Any]] = field(default_factory=list)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReviewEntry":
+        """
+        Rebuild an entry from the plain dict form it is persisted in
+        
+        Keys this version does not know, left by another version of the server, are ignored.
+        """
+        file_fields = {f.name for f in fields(FileEntry)}
+        code_content = {
+            path: FileEntry(**{key: value for key, value in file_data.items() if key in file_fields})
+            for path, file_data in data.get("code_content", {}).items()
+        }
+        entry_fields = {f.name for f in fields(cls)} - {"code_content"}
+        return cls(**{key: value for key, value in data.items() if key in entry_fields}, code_content=code_content)
+    
+    def details(self) -> Dict[str, Any]:
+        """Return the review details, leaving out the stored file contents"""
+        return {
+            "repo_info": self.repo_info,
+            "review_results": self.review_results,
+            "focus_areas": self.focus_areas,
+            "review_date": self.review_date
+        }
+
+
+class RepoStore:
+    """
+    Store for repository data and review information, persisted in the on-disk cache
+    
+    Writes and listings are serialized with an asyncio.Lock so concurrent tool calls
+    cannot interleave an update. Review summaries are maintained on write so listing
+    needs no per-call traversal of the stored data. Only the most recently used reviews
+    are held in memory; the rest, including reviews saved by earlier runs, are read back
+    from disk when accessed.
+    """
+    
+    def __init__(self, maxsize: int):
+        self._data: OrderedDict = OrderedDict()
+        self._summaries: Dict[str, RepoSummary] = {}
+        self._lock = asyncio.Lock()
+        self._loaded = False
+        self._maxsize = maxsize
+    
+    def __getitem__(self, repo_key: str) -> ReviewEntry:
+        self._load()
+        if repo_key in self._data:
+            self._data.move_to_end(repo_key)
+            return self._data[repo_key]
+        entry = ReviewEntry.from_dict(get_etag_cache()[REVIEW_CACHE_PREFIX + repo_key])
+        self._remember(repo_key, entry)
+        return entry
+    
+    def get(self, repo_key: str) -> Optional[ReviewEntry]:
+        """Return the review entry for a repository, or None if it has not been reviewed"""
+        self._load()
+        if repo_key not in self._summaries:
+            return None
+        try:
+            return self[repo_key]
+        except Exception:
+            # A stored review that cannot be read back (missing fields, damaged data) counts as not reviewed
+            return None
+    
+    def _load(self) -> None:
+        """Build the summary rows of the reviews persisted by earlier runs, once"""
+        if self._loaded:
+            return
+        self._loaded = True
+        # Only the index is read; full reviews are loaded when first accessed
+        for repo_key, (review_date, focus_areas) in get_etag_cache().get(REVIEW_INDEX_KEY, {}).items():
+            self._summarize(repo_key, review_date, focus_areas)
+    
+    def _remember(self, repo_key: str, entry: ReviewEntry) -> None:
+        """Keep an entry in memory, evicting the least recently used one past maxsize"""
+        self._data[repo_key] = entry
+        self._data.move_to_end(repo_key)
+        if len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+    
+    def _summarize(self, repo_key: str, review_date: str, focus_areas: Optional[str]) -> None:
+        # Rows are kept as frozen instances and only turned into dicts when listed, so callers get copies
+        self._summaries[repo_key] = RepoSummary(
+            repo=repo_key,
+            review_date=review_date,
+            focus_areas=focus_areas or "General review"
+        )
+    
+    async def set(self, repo_key: str, entry: ReviewEntry) -> None:
+        """Store the review entry for a repository, replacing any previous review"""
+        async with self._lock:
+            self._load()
+            self._remember(repo_key, entry)
+            self._summarize(repo_key, entry.review_date, entry.focus_areas)
+            cache = get_etag_cache()
+            # Stored as a plain dict so the cache does not depend on how this module was imported
+            cache[REVIEW_CACHE_PREFIX + repo_key] = asdict(entry)
+            cache[REVIEW_INDEX_KEY] = {
+                key: (summary.review_date, summary.focus_areas) for key, summary in self._summaries.items()
+            }
+    
+    async def summaries(self) -> List[Dict[str, Any]]:
+        """Return the summary rows of all reviewed repositories"""
+        async with self._lock:
+            self._load()
+            return [asdict(summary) for summary in self._summaries.values()]
+
+
+# Placeholder results returned by the analysis tools until real analysis is implemented;
+# the tools return deep copies, so a caller changing a result cannot alter later ones
+PLACEHOLDER_DEPENDENCY_ANALYSIS = {
+    "dependencies": {
+        "direct": 15,
+        "indirect": 47,
+        "outdated": 3,
+        "vulnerable": 1,
+    },
+    "recommendations": [
+        "Update lodash from 4.17.15 to 4.17.21 to fix security vulnerabilities",
+        "Consider replacing moment.js with date-fns for better tree-shaking"
+    ]
+}
+
+PLACEHOLDER_SECURITY_SCAN = {
+    "scan_results": {
+        "critical": 0,
+        "high": 1,
+        "medium": 2,
+        "low": 3
+    },
+    "vulnerabilities": [
+        {
+            "severity": "high",
+            "description": "SQL Injection vulnerability in user input processing",
+            "location": "src/controllers/user.js:45",
+            "remediation": "Use parameterized queries or an ORM to handle user input"
+        },
+        {
+            "severity": "medium",
+            "description": "Insecure direct object reference",
+            "location": "src/api/orders.js:78",
+            "remediation": "Implement proper authorization checks before fetching resources"
+        }
+    ]
+}
+
+PLACEHOLDER_CODE_QUALITY = {
+    "quality_metrics": {
+        "maintainability_index": 75,
+        "cyclomatic_complexity": {
+            "average": 12,
+            "worst_file": "src/utils/data-processor.js",
+            "worst_value": 45
+        },
+        "code_duplication": {
+            "percentage": 7.5,
+            "hotspots": [
+                "src/components/forms",
+                "src/utils/helpers.js"
+            ]
+        },
+        "test_coverage": {
+            "percentage": 68,
+            "uncovered_critical_paths": [
+                "src/services/authentication.js",
+                "src/controllers/payment.js"
+            ]
+        }
+    },
+    "recommendations": [
+        "Refactor src/utils/data-processor.js to reduce complexity",
+        "Extract duplicated code in form components into shared utilities",
+        "Add integration tests for critical user flows"
+    ]
+}
+
+PLACEHOLDER_PERFORMANCE_ANALYSIS = {
+    "performance_issues": [
+        {
+            "severity": "high",
+            "description": "Inefficient database query with N+1 problem",
+            "location": "src/services/products.js:67",
+            "impact": "Slow page load times when listing products with many relations",
+            "suggestion": "Use eager loading or GraphQL to fetch all needed data in one query"
+        },
+        {
+            "severity": "medium",
+            "description": "Render blocking JavaScript",
+            "location": "public/index.html:15-18",
+            "impact": "Delayed page interactivity and poor Lighthouse score",
+            "suggestion": "Use defer attribute or move script tags to end of body"
+        }
+    ],
+    "optimization_opportunities": [
+        "Implement code splitting to reduce initial bundle size",
+        "Add caching headers for static assets",
+        "Consider server-side rendering for initial page load"
+    ]
+}
+
+PLACEHOLDER_BEST_PRACTICES = {
+    "compliance_score": 72,
+    "areas": {
+        "project_structure": {
+            "score": 85,
+            "feedback": "Follows most React project structure conventions"
+        },
+        "state_management": {
+            "score": 60,
+            "feedback": "Inconsistent use of context API and Redux"
+        },
+        "component_design": {
+            "score": 78,
+            "feedback": "Good use of functional components, but some could be further decomposed"
+        },
+        "testing": {
+            "score": 65,
+            "feedback": "Unit tests present but integration tests missing"
+        }
+    },
+    "recommendations": [
+        "Standardize on a single state management approach",
+        "Break down larger components into smaller, reusable ones",
+        "Add integration tests for critical user flows"
+    ]
+}
+
+PLACEHOLDER_PULL_REQUEST_DESCRIPTION = {
+    "pull_request_description": {
+        "title": "Refactor authentication service and fix security vulnerabilities",
+        "body": """
+## Changes
+
+This PR refactors the authentication service to improve security and maintainability:
+
+- Fix potential SQL injection vulnerability in login endpoint
+- Implement proper password hashing with bcrypt
+- Add rate limiting for failed login attempts
+- Refactor token generation for better testability
+
+## Testing
+
+- [x] Unit tests added for password hashing
+- [x] Integration tests for login flow
+- [x] Manual testing with various user roles
+
+## Reviewers
+
+Please pay special attention to the security changes in `src/services/auth.js`.
+            """
+    }
+}
+
+# Number of reviews kept in memory; older ones are read back from the on-disk cache
+REVIEW_MEMORY_SIZE = 64
+
 # Store for repository data and review information
-repo_data = {}
+repo_data = RepoStore(REVIEW_MEMORY_SIZE)
 
 # GitHub API configuration
-GITHUB_API_TOKEN = os.environ.get("GITHUB_API_TOKEN", "")  # Get from environment variable
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_RAW_URL = "https://raw.githubusercontent.com"
+GITHUB_API_TOKEN = os.environ.get("GITHUB_API_TOKEN") or os.environ.get("GITHUB_TOKEN", "")  # Get from environment variable
 GITHUB_HEADERS = {
-    "Accept": "application/vnd.github.v3+json"
+    "Accept": "application/vnd.github+json"
 }
 if GITHUB_API_TOKEN:
-    GITHUB_HEADERS["Authorization"] = f"token {GITHUB_API_TOKEN}"
+    GITHUB_HEADERS["Authorization"] = f"Bearer {GITHUB_API_TOKEN}"
+
+# Claude API configuration
+ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
+CLAUDE_MODEL = os.environ.get("CLAUDE_MODEL", "claude-3-7-sonnet-latest")
+CLAUDE_MAX_TOKENS = 4096
+
+# On-disk cache of GitHub API responses, keyed by URL and revalidated with ETags
+GITHUB_CACHE_PATH = os.environ.get("GITHUB_CACHE_PATH", os.path.expanduser("~/.mcp_gh_cache"))
+
+# Key of the cached response URLs, least recently used first, and how many responses are kept
+ETAG_INDEX_KEY = "etag-index"
+ETAG_CACHE_SIZE = 2000
+
+# Key prefix for file contents stored in the same cache by blob SHA rather than by URL
+BLOB_CACHE_PREFIX = "blob:"
+
+# Key of the cached blobs, least recently used first, and how many blobs are kept
+BLOB_INDEX_KEY = "blob-index"
+BLOB_CACHE_SIZE = 5000
+
+# Key prefix for reviews kept in the same cache so they survive restarts
+REVIEW_CACHE_PREFIX = "review:"
+
+# Key of the summary rows of all stored reviews, read at startup instead of the reviews themselves
+REVIEW_INDEX_KEY = "review-index"
+
+# A GitHub repository URL, capturing the owner and repository name
+GITHUB_REPO_URL_PATTERN = re.compile(r"^https?://(?:www\.)?github\.com/+([^/\s?#]+)/+([^/\s?#]+?)(?:\.git)?(?:[/?#]\S*)?$")
+
+# The message field of a GitHub JSON error body, allowing escaped characters in the string
+GITHUB_ERROR_MESSAGE_PATTERN = re.compile(rb'"message"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+# A full 40-character commit SHA, which needs no resolving
+FULL_SHA_PATTERN = re.compile(r"[0-9a-f]{40}")
+
+# File extensions treated as reviewable code
+CODE_EXTS = frozenset({
+    "py", "js", "ts", "jsx", "tsx", "java", "c", "cpp", "cs",
+    "go", "rb", "php", "swift", "kt", "rs", "html", "css", "scss"
+})
+
+# Directories holding dependencies or generated output rather than reviewable source
+IGNORED_DIRECTORIES = frozenset({"node_modules", ".git", "dist", "build", "vendor", "__pycache__"})
+
+# Files larger than this (per the size hint in the tree listing) are not downloaded for review
+MAX_FILE_SIZE = 100_000
+
+# Per-file and total size limits for code included in the review prompt
+MAX_PROMPT_FILE_SIZE = 64_000
+MAX_PROMPT_SIZE = 500_000
+
+# Paths included first and last when the prompt size limit is reached
+PRIORITY_PATH_PATTERN = re.compile(r"(^|/)(src|lib)/")
+LOW_PRIORITY_PATH_PATTERN = re.compile(r"(^|/)(tests?|examples?)/")
+
+# Prompt block for a single file in the review prompt
+FILE_PROMPT_TEMPLATE = "File: {0}\n```\n{1}\n```\n\n"
+
+# Simple patterns flagged by find_security_issues, grouped by issue type. Gaps are lazy, bounded and
+# kept within one line, and atomic groups commit to the first keyword found, so a long line that
+# does not match cannot cause runaway backtracking
+SECURITY_PATTERNS = {
+    "sql_injection": [
+        r"SELECT\b(?>[^\n]{0,300}?\bFROM\b)(?>[^\n]{0,300}?\bWHERE\b)[^\n]{0,200}?\+",
+        r"SELECT\b(?>[^\n]{0,300}?\bFROM\b)(?>[^\n]{0,300}?\bWHERE\b)[^\n]{0,200}?\$",
+        r"executeQuery\([^\n]{0,200}?\+",
+    ],
+    "xss": [
+        r"innerHTML[^\n]{0,100}?=",
+        r"document\.write\(",
+        r"eval\(",
+    ],
+    "hardcoded_secrets": [
+        r"apiKey(?>[^\n]{0,100}?=)[^\n]{0,200}?['\"]",
+        r"password(?>[^\n]{0,100}?=)[^\n]{0,200}?['\"]",
+        r"secret(?>[^\n]{0,100}?=)[^\n]{0,200}?['\"]",
+    ]
+}
+
+# All security patterns compiled once, case-insensitively, into one alternation so each file is scanned in a single pass
+SECURITY_PATTERN = re.compile("|".join(
+    f"(?P<{issue_type}>{'|'.join(patterns)})" for issue_type, patterns in SECURITY_PATTERNS.items()
+), re.IGNORECASE)
+
+# Literal text a security pattern starts with: plain characters and escaped punctuation, stopping
+# before any character made optional or repeated by a quantifier
+SECURITY_PATTERN_PREFIX = re.compile(r"(?:(?:\\[^A-Za-z0-9]|[A-Za-z0-9_])(?![?*+{]))+")
+
+
+def security_keyword(pattern: str) -> str:
+    """
+    Return the casefolded literal text a security pattern starts with, or "" if it has none
+    
+    A pattern containing an alternation gives "", as its other branches may start differently.
+    """
+    if "|" in pattern:
+        return ""
+    match = SECURITY_PATTERN_PREFIX.match(pattern)
+    return re.sub(r"\\(.)", r"\1", match.group()).casefold() if match else ""
+
+
+# The keyword of every security pattern; a file containing none of them cannot match. A pattern
+# without a keyword adds "", which every file contains, so it disables the check rather than
+# missing matches.
+SECURITY_KEYWORDS = tuple(dict.fromkeys(
+    security_keyword(pattern) for patterns in SECURITY_PATTERNS.values() for pattern in patterns
+))
+
+# One requirements.txt entry: a package name, optional extras and an optional version specifier,
+# which may list several comma-separated clauses.
+# Option lines (-e, -r, --index-url) and bare URL or VCS lines (git+https://, https://...whl) are
+# skipped, and the name must end where an entry can continue, so "git+https" is not read as "git"
+REQUIREMENT_PATTERN = re.compile(r"(?m)^(?![ \t]*(?:-|[A-Za-z][A-Za-z0-9+.\-]*:))[ \t]*([A-Za-z0-9][A-Za-z0-9_.\-]*)(?:\[[^\]\n]*\])?(?=[ \t\r<>=!~;@#]|$)[ \t]*(?:([<>=!~]=?=?)[ \t]*([^;#\s,]+(?:[ \t]*,[ \t]*[<>=!~]=?=?[ \t]*[^;#\s,]+)*))?")
+
+# Number of files fetched per GraphQL query when a token is configured
+GRAPHQL_BATCH_SIZE = 50
+
+# Number of parsed trees kept in memory; a tree is immutable for a given SHA, but a recursive
+# listing can run to several megabytes, so only the last few are kept. File contents are not
+# kept in memory, as the blob cache already holds them
+TREE_CACHE_SIZE = 8
+
+# Repository metadata changes over time, so it is only kept for a few minutes
+REPO_INFO_CACHE_SIZE = 256
+REPO_INFO_CACHE_TTL = 300.0
+
+# Maximum number of pooled connections to the GitHub API, and how long idle ones are kept alive
+GITHUB_MAX_CONNECTIONS = 20
+GITHUB_KEEPALIVE_EXPIRY = 60.0
+
+# Retries for transient GitHub server errors, with exponential backoff (in seconds)
+GITHUB_RETRY_STATUSES = frozenset({502, 503, 504})
+GITHUB_MAX_RETRIES = 3
+GITHUB_RETRY_BACKOFF = 0.5
+
+# Rate limit handling: throttle when few requests remain, and wait at most this long (in seconds)
+GITHUB_RATE_LIMIT_THRESHOLD = 10
+GITHUB_MAX_RATE_LIMIT_WAIT = 60.0
+
+# Limit on concurrent in-flight GitHub requests to stay clear of secondary rate limits
+github_semaphore = asyncio.Semaphore(10)
+
+# Number of parsed dependency results kept in memory
+DEPENDENCY_CACHE_SIZE = 32
+
+# Number of concurrent workers listing directories when a recursive tree is truncated
+TREE_WALK_WORKERS = 10
+
+# Time (epoch seconds) before which no new GitHub requests are sent, set when the rate limit runs low
+rate_limit_resume_at = 0.0
+
+# Shared HTTP client, created lazily on first use
+http_client: Optional[httpx.AsyncClient] = None
+
+# Shared Anthropic API client, created lazily on first use
+anthropic_client: Optional[anthropic.AsyncAnthropic] = None
+
+# ETag cache mapping request URLs to (etag, body), opened lazily on first use; a plain dict
+# when the cache file cannot be opened
+etag_cache: Optional[MutableMapping] = None
+
+# Parsed dependencies keyed by the paths and content digests of the manifests they came from
+dependency_cache: OrderedDict = OrderedDict()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client for GitHub API calls, creating it on first use"""
+    global http_client
+    if http_client is None:
+        # HTTP/2 multiplexes the many concurrent file fetches over a single connection per host;
+        # the transport also retries failed connection attempts
+        http_client = httpx.AsyncClient(
+            headers=GITHUB_HEADERS,
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=GITHUB_MAX_RETRIES,
+                limits=httpx.Limits(
+                    max_connections=GITHUB_MAX_CONNECTIONS,
+                    max_keepalive_connections=GITHUB_MAX_CONNECTIONS,
+                    keepalive_expiry=GITHUB_KEEPALIVE_EXPIRY
+                )
+            )
+        )
+    return http_client
+
+
+def async_lru_cache(maxsize: int, ttl: Optional[float] = None):
+    """
+    Memoize a coroutine function in an LRU cache keyed by its arguments
+    
+    Error dicts (results with an "error" key) are not cached, so failed fetches are retried.
+    When ttl is given, cached results older than ttl seconds are fetched again.
+    """
+    def decorator(fn):
+        cache: OrderedDict = OrderedDict()
+        
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            if key in cache:
+                expires_at, result = cache[key]
+                if expires_at is None or expires_at > time.monotonic():
+                    cache.move_to_end(key)
+                    return result
+                del cache[key]
+            result = await fn(*args, **kwargs)
+            if not (isinstance(result, dict) and "error" in result):
+                cache[key] = (None if ttl is None else time.monotonic() + ttl, result)
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return result
+        
+        return wrapper
+    return decorator
+
+
+def require_repo(not_found: str = "Repository data not found."):
+    """
+    Look up the stored review for a tool's repo_key argument and pass it in as repository_data
+    
+    Returns an error dict instead of calling the tool when the repository has not been reviewed.
+    The repository_data parameter is hidden from the tool's signature, so it is not exposed to clients.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+        
+        @functools.wraps(fn)
+        def wrapper(repo_key: str, *args, **kwargs):
+            repository_data = repo_data.get(repo_key)
+            if repository_data is None:
+                return {"error": not_found}
+            return fn(repo_key, repository_data, *args, **kwargs)
+        
+        wrapper.__signature__ = signature.replace(
+            parameters=[param for name, param in signature.parameters.items() if name != "repository_data"]
+        )
+        return wrapper
+    return decorator
+
+
+def get_etag_cache() -> MutableMapping:
+    """
+    Return the on-disk ETag cache, opening it on first use
+    
+    The cache file is meant for one server process. If it cannot be opened, for example
+    because another process holds the gdbm lock, an in-memory dict is used instead.
+    """
+    global etag_cache
+    if etag_cache is None:
+        try:
+            etag_cache = shelve.open(GITHUB_CACHE_PATH)
+        except dbm.error:
+            etag_cache = {}
+        else:
+            atexit.register(etag_cache.close)
+    return etag_cache
+
+
+def touch_cache_index(cache: MutableMapping, index_key: str, keys: Iterable[str], maxsize: int) -> None:
+    """
+    Mark cache keys as recently used in the LRU index stored under index_key
+    
+    Keys past maxsize are deleted from the cache, least recently used first. The index is
+    read and written back without an await in between, so concurrent tool calls cannot
+    drop each other's keys.
+    """
+    index = cache.get(index_key) or OrderedDict()
+    for key in keys:
+        index[key] = None
+        index.move_to_end(key)
+    while len(index) > maxsize:
+        key, _ = index.popitem(last=False)
+        cache.pop(key, None)
+    cache[index_key] = index
+
+
+def header_number(response: httpx.Response, name: str) -> Optional[float]:
+    """Read a numeric header, or None if it is missing or not a number (such as a Retry-After date)"""
+    try:
+        return float(response.headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def track_rate_limit(response: httpx.Response) -> None:
+    """Pause new requests until the rate limit resets when few requests remain in the window"""
+    global rate_limit_resume_at
+    remaining = header_number(response, "X-RateLimit-Remaining")
+    reset_at = header_number(response, "X-RateLimit-Reset")
+    if remaining is None or reset_at is None or remaining >= GITHUB_RATE_LIMIT_THRESHOLD:
+        return
+    # Only throttle for short waits; longer ones surface as rate limit errors instead of hanging the tool
+    if reset_at - time.time() <= GITHUB_MAX_RATE_LIMIT_WAIT:
+        rate_limit_resume_at = max(rate_limit_resume_at, reset_at)
+
+
+def rate_limit_wait(response: httpx.Response) -> Optional[float]:
+    """
+    Return how many seconds to wait before retrying a rate-limited response
+    
+    Secondary rate limits send Retry-After; an exhausted primary limit reports its
+    reset time. Returns None if the response was not rate limited or the wait
+    cannot be read.
+    """
+    if response.status_code not in (403, 429):
+        return None
+    retry_after = header_number(response, "Retry-After")
+    if retry_after is not None:
+        return retry_after
+    reset_at = header_number(response, "X-RateLimit-Reset")
+    if header_number(response, "X-RateLimit-Remaining") == 0 and reset_at is not None:
+        return max(0.0, reset_at - time.time())
+    return None
+
+
+def github_error_message(response: httpx.Response) -> str:
+    """
+    Extract the message field of a GitHub error response without parsing the whole body
+    
+    Bodies that are not GitHub JSON, such as proxy error pages, give "No additional details",
+    and a message with an invalid escape gives the status text.
+    """
+    match = GITHUB_ERROR_MESSAGE_PATTERN.search(response.content)
+    if not match:
+        return "No additional details"
+    # The captured bytes are a JSON string literal, so orjson undoes its escapes
+    try:
+        return orjson.loads(b'"' + match.group(1) + b'"')
+    except orjson.JSONDecodeError:
+        return response.reason_phrase or "No additional details"
+
+
+async def github_request(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Send a request to GitHub, honoring the rate limit pause and retrying transient failures
+    
+    Transient server errors are retried with exponential backoff, and rate-limited
+    responses are retried after the wait GitHub asks for when it is short.
+    """
+    for attempt in range(GITHUB_MAX_RETRIES + 1):
+        delay = rate_limit_resume_at - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        
+        async with github_semaphore:
+            response = await get_http_client().request(method, url, **kwargs)
+        track_rate_limit(response)
+        
+        if attempt == GITHUB_MAX_RETRIES:
+            break
+        if response.status_code in GITHUB_RETRY_STATUSES:
+            await asyncio.sleep(GITHUB_RETRY_BACKOFF * 2 ** attempt)
+            continue
+        wait = rate_limit_wait(response)
+        if wait is None or wait > GITHUB_MAX_RATE_LIMIT_WAIT:
+            break
+        await asyncio.sleep(wait)
+    return response
+
+
+async def cached_get(url: str, params: Optional[Dict[str, str]] = None, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+    """
+    Send a conditional GET request to the GitHub API
+    
+    Cached responses are revalidated with If-None-Match; a 304 reply does not count
+    against the rate limit and is answered from the cache as a regular 200 response.
+    Retries follow github_request. Extra headers (such as a different Accept type)
+    are part of the cache key.
+    """
+    cache = get_etag_cache()
+    cache_key = str(httpx.URL(url, params=params))
+    if headers:
+        cache_key += "|" + "|".join(f"{name}={value}" for name, value in sorted(headers.items()))
+    cached = cache.get(cache_key)
+    headers = dict(headers or {})
+    if cached:
+        headers["If-None-Match"] = cached[0]
+    
+    response = await github_request("GET", url, params=params, headers=headers)
+    
+    if response.status_code == 304 and cached:
+        touch_cache_index(cache, ETAG_INDEX_KEY, [cache_key], ETAG_CACHE_SIZE)
+        return httpx.Response(200, content=cached[1], request=response.request)
+    if response.status_code == 200 and "ETag" in response.headers:
+        cache[cache_key] = (response.headers["ETag"], response.content)
+        touch_cache_index(cache, ETAG_INDEX_KEY, [cache_key], ETAG_CACHE_SIZE)
+    return response
+
 
 @mcp.tool()
-def review_repository(repo_url: str, focus_areas: Optional[str] = None) -> Dict[str, Any]:
+async def review_repository(repo_url: str, focus_areas: Optional[str] = None) -> Dict[str, Any]:
     """
     Review a GitHub repository using Claude
     
@@ -36,27 +751,44 @@ def review_repository(repo_url: str, focus_areas: Optional[str] = None) -> Dict[
     Returns:
         A dictionary containing the review results
     """
-    # Parse repository information from URL
-    parsed_url = urlparse(repo_url)
-    
-    if "github.com" not in parsed_url.netloc:
-        return {"error": "Invalid GitHub URL. Please provide a valid GitHub repository URL."}
-    
-    # Extract username and repo name from path
-    path_parts = [p for p in parsed_url.path.split('/') if p]
-    if len(path_parts) < 2:
+    # Parse owner and repository name from the URL, dropping a trailing .git and any deeper path
+    repo_url = repo_url.strip()
+    match = GITHUB_REPO_URL_PATTERN.match(repo_url)
+    if not match:
+        if "github.com" not in repo_url:
+            return {"error": "Invalid GitHub URL. Please provide a valid GitHub repository URL."}
         return {"error": "Invalid GitHub repository URL format."}
     
-    owner = path_parts[0]
-    repo = path_parts[1]
+    owner, repo = match.groups()
+    
+    repo_key = f"{owner}/{repo}"
     
-    # Get repository data
-    repo_info = fetch_repo_info(owner, repo)
+    # Get repository data and the head commit concurrently; they do not depend on each other
+    repo_info, head = await asyncio.gather(
+        fetch_repo_info(owner, repo),
+        fetch_head_sha(owner, repo)
+    )
     if "error" in repo_info:
         return repo_info
+    if "error" in head:
+        return head
+    
+    # An unchanged repository reviewed with the same focus areas by the current model reuses the
+    # stored review; placeholder reviews record no model, so they are always generated again
+    previous = repo_data.get(repo_key)
+    if (
+        previous is not None
+        and previous.head_sha == head["sha"]
+        and previous.focus_areas == focus_areas
+        and previous.model == CLAUDE_MODEL
+    ):
+        return {
+            "repo": repo_key,
+            "review": previous.review_results,
+            "status": "completed"
+        }
     
-    # Get repository files
-    files = fetch_repo_files(owner, repo)
+    files = await fetch_repo_files(owner, repo, ref=head["sha"], max_total_size=MAX_PROMPT_SIZE)
     if "error" in files:
         return files
     
@@ -64,18 +796,24 @@ def review_repository(repo_url: str, focus_areas: Optional[str] = None) -> Dict[
     code_content = prepare_code_for_review(files)
     
     # Create review prompt based on focus areas
-    review_prompt = create_review_prompt(code_content, focus_areas)
+    code_context = create_code_context(code_content)
+    review_prompt = create_review_prompt(focus_areas)
     
-    # Generate review using Claude (in a real implementation, this would call Claude API)
-    review_results = generate_review(review_prompt)
+    # Generate review using Claude
+    review_results = await generate_review(code_context, review_prompt)
+    if "error" in review_results:
+        return review_results
     
     # Store the results for this repository
-    repo_key = f"{owner}/{repo}"
-    repo_data[repo_key] = {
-        "repo_info": repo_info,
-        "review_results": review_results,
-        "focus_areas": focus_areas
-    }
+    await repo_data.set(repo_key, ReviewEntry(
+        repo_info=repo_info,
+        review_results=review_results,
+        focus_areas=focus_areas,
+        review_date=datetime.now().isoformat(timespec="seconds"),
+        code_content=code_content,
+        head_sha=head["sha"],
+        model=CLAUDE_MODEL if ANTHROPIC_API_KEY else None
+    ))
     
     return {
         "repo": repo_key,
@@ -85,25 +823,19 @@ def review_repository(repo_url: str, focus_areas: Optional[str] = None) -> Dict[
 
 
 @mcp.tool()
-def list_reviewed_repos() -> List[Dict[str, Any]]:
+async def list_reviewed_repos() -> List[Dict[str, Any]]:
     """
     List all repositories that have been reviewed
     
     Returns:
         A list of repository information with review statuses
     """
-    result = []
-    for repo_key, data in repo_data.items():
-        result.append({
-            "repo": repo_key,
-            "review_date": data.get("review_date", "N/A"),
-            "focus_areas": data.get("focus_areas", "General review")
-        })
-    return result
+    return await repo_data.summaries()
 
 
 @mcp.tool()
-def get_review_details(repo_key: str) -> Dict[str, Any]:
+@require_repo("Repository review not found.")
+def get_review_details(repo_key: str, repository_data: ReviewEntry) -> Dict[str, Any]:
     """
     Get detailed review results for a specific repository
     
@@ -113,14 +845,12 @@ def get_review_details(repo_key: str) -> Dict[str, Any]:
     Returns:
         Detailed review information for the specified repository
     """
-    if repo_key not in repo_data:
-        return {"error": "Repository review not found."}
-    
-    return repo_data[repo_key]
+    return repository_data.details()
 
 
 @mcp.tool()
-def suggest_improvements(repo_key: str, file_path: Optional[str] = None) -> Dict[str, Any]:
+@require_repo("Repository review not found.")
+def suggest_improvements(repo_key: str, repository_data: ReviewEntry, file_path: Optional[str] = None) -> Dict[str, Any]:
     """
     Suggest specific improvements for a repository or file
     
@@ -131,14 +861,10 @@ def suggest_improvements(repo_key: str, file_path: Optional[str] = None) -> Dict
     Returns:
         Improvement suggestions for the repository or file
     """
-    if repo_key not in repo_data:
-        return {"error": "Repository review not found."}
-    
     # In a real implementation, this would call Claude with specific prompts
     # for generating improvement suggestions
     
-    repository_data = repo_data[repo_key]
-    code_content = repository_data.get("code_content", {})
+    code_content = repository_data.code_content
     
     if file_path and file_path in code_content:
         # Generate suggestions for specific file
@@ -159,7 +885,8 @@ def suggest_improvements(repo_key: str, file_path: Optional[str] = None) -> Dict
 
 
 @mcp.tool()
-def analyze_dependencies(repo_key: str) -> Dict[str, Any]:
+@require_repo()
+def analyze_dependencies(repo_key: str, repository_data: ReviewEntry) -> Dict[str, Any]:
     """
     Analyze dependencies in a repository
     
@@ -169,31 +896,15 @@ def analyze_dependencies(repo_key: str) -> Dict[str, Any]:
     Returns:
         Dependency analysis results including outdated packages, vulnerabilities, and recommendations
     """
-    if repo_key not in repo_data:
-        return {"error": "Repository data not found."}
-    
-    repository_data = repo_data[repo_key]
-    
     # For a real implementation, this would analyze package.json, requirements.txt, etc.
     # For this demo, we're returning placeholder data
     
-    return {
-        "repo": repo_key,
-        "dependencies": {
-            "direct": 15,
-            "indirect": 47,
-            "outdated": 3,
-            "vulnerable": 1,
-        },
-        "recommendations": [
-            "Update lodash from 4.17.15 to 4.17.21 to fix security vulnerabilities",
-            "Consider replacing moment.js with date-fns for better tree-shaking"
-        ]
-    }
+    return {"repo": repo_key, **copy.deepcopy(PLACEHOLDER_DEPENDENCY_ANALYSIS)}
 
 
 @mcp.tool()
-def scan_security_vulnerabilities(repo_key: str) -> Dict[str, Any]:
+@require_repo()
+def scan_security_vulnerabilities(repo_key: str, repository_data: ReviewEntry) -> Dict[str, Any]:
     """
     Scan a repository for security vulnerabilities
     
@@ -203,41 +914,15 @@ def scan_security_vulnerabilities(repo_key: str) -> Dict[str, Any]:
     Returns:
         Security scan results with identified vulnerabilities and remediation steps
     """
-    if repo_key not in repo_data:
-        return {"error": "Repository data not found."}
-    
-    repository_data = repo_data[repo_key]
-    
     # For a real implementation, this would integrate with security scanning tools
     # For this demo, we're returning placeholder data
     
-    return {
-        "repo": repo_key,
-        "scan_results": {
-            "critical": 0,
-            "high": 1,
-            "medium": 2,
-            "low": 3
-        },
-        "vulnerabilities": [
-            {
-                "severity": "high",
-                "description": "SQL Injection vulnerability in user input processing",
-                "location": "src/controllers/user.js:45",
-                "remediation": "Use parameterized queries or an ORM to handle user input"
-            },
-            {
-                "severity": "medium",
-                "description": "Insecure direct object reference",
-                "location": "src/api/orders.js:78",
-                "remediation": "Implement proper authorization checks before fetching resources"
-            }
-        ]
-    }
+    return {"repo": repo_key, **copy.deepcopy(PLACEHOLDER_SECURITY_SCAN)}
 
 
 @mcp.tool()
-def analyze_code_quality(repo_key: str) -> Dict[str, Any]:
+@require_repo()
+def analyze_code_quality(repo_key: str, repository_data: ReviewEntry) -> Dict[str, Any]:
     """
     Analyze code quality metrics for a repository
     
@@ -247,48 +932,15 @@ def analyze_code_quality(repo_key: str) -> Dict[str, Any]:
     Returns:
         Code quality metrics including complexity, duplication, and maintainability
     """
-    if repo_key not in repo_data:
-        return {"error": "Repository data not found."}
-    
-    repository_data = repo_data[repo_key]
-    
     # For a real implementation, this would integrate with code quality tools
     # For this demo, we're returning placeholder data
     
-    return {
-        "repo": repo_key,
-        "quality_metrics": {
-            "maintainability_index": 75,
-            "cyclomatic_complexity": {
-                "average": 12,
-                "worst_file": "src/utils/data-processor.js",
-                "worst_value": 45
-            },
-            "code_duplication": {
-                "percentage": 7.5,
-                "hotspots": [
-                    "src/components/forms",
-                    "src/utils/helpers.js"
-                ]
-            },
-            "test_coverage": {
-                "percentage": 68,
-                "uncovered_critical_paths": [
-                    "src/services/authentication.js",
-                    "src/controllers/payment.js"
-                ]
-            }
-        },
-        "recommendations": [
-            "Refactor src/utils/data-processor.js to reduce complexity",
-            "Extract duplicated code in form components into shared utilities",
-            "Add integration tests for critical user flows"
-        ]
-    }
+    return {"repo": repo_key, **copy.deepcopy(PLACEHOLDER_CODE_QUALITY)}
 
 
 @mcp.tool()
-def analyze_performance(repo_key: str) -> Dict[str, Any]:
+@require_repo()
+def analyze_performance(repo_key: str, repository_data: ReviewEntry) -> Dict[str, Any]:
     """
     Analyze performance issues in a repository
     
@@ -298,42 +950,15 @@ def analyze_performance(repo_key: str) -> Dict[str, Any]:
     Returns:
         Performance analysis with potential bottlenecks and optimization suggestions
     """
-    if repo_key not in repo_data:
-        return {"error": "Repository data not found."}
-    
-    repository_data = repo_data[repo_key]
-    
     # For a real implementation, this would perform static analysis for performance issues
     # For this demo, we're returning placeholder data
     
-    return {
-        "repo": repo_key,
-        "performance_issues": [
-            {
-                "severity": "high",
-                "description": "Inefficient database query with N+1 problem",
-                "location": "src/services/products.js:67",
-                "impact": "Slow page load times when listing products with many relations",
-                "suggestion": "Use eager loading or GraphQL to fetch all needed data in one query"
-            },
-            {
-                "severity": "medium",
-                "description": "Render blocking JavaScript",
-                "location": "public/index.html:15-18",
-                "impact": "Delayed page interactivity and poor Lighthouse score",
-                "suggestion": "Use defer attribute or move script tags to end of body"
-            }
-        ],
-        "optimization_opportunities": [
-            "Implement code splitting to reduce initial bundle size",
-            "Add caching headers for static assets",
-            "Consider server-side rendering for initial page load"
-        ]
-    }
+    return {"repo": repo_key, **copy.deepcopy(PLACEHOLDER_PERFORMANCE_ANALYSIS)}
 
 
 @mcp.tool()
-def compare_with_best_practices(repo_key: str, framework: Optional[str] = None) -> Dict[str, Any]:
+@require_repo()
+def compare_with_best_practices(repo_key: str, repository_data: ReviewEntry, framework: Optional[str] = None) -> Dict[str, Any]:
     """
     Compare repository against industry best practices
     
@@ -344,11 +969,6 @@ def compare_with_best_practices(repo_key: str, framework: Optional[str] = None)
     Returns:
         Comparison results and recommendations based on best practices
     """
-    if repo_key not in repo_data:
-        return {"error": "Repository data not found."}
-    
-    repository_data = repo_data[repo_key]
-    
     # Detect framework if not provided
     if not framework:
         # In a real implementation, detect from package.json, requirements.txt, etc.
@@ -357,38 +977,12 @@ def compare_with_best_practices(repo_key: str, framework: Optional[str] = None)
     # For a real implementation, this would check against established best practices
     # For this demo, we're returning placeholder data
     
-    return {
-        "repo": repo_key,
-        "framework": framework,
-        "compliance_score": 72,
-        "areas": {
-            "project_structure": {
-                "score": 85,
-                "feedback": "Follows most React project structure conventions"
-            },
-            "state_management": {
-                "score": 60,
-                "feedback": "Inconsistent use of context API and Redux"
-            },
-            "component_design": {
-                "score": 78,
-                "feedback": "Good use of functional components, but some could be further decomposed"
-            },
-            "testing": {
-                "score": 65,
-                "feedback": "Unit tests present but integration tests missing"
-            }
-        },
-        "recommendations": [
-            "Standardize on a single state management approach",
-            "Break down larger components into smaller, reusable ones",
-            "Add integration tests for critical user flows"
-        ]
-    }
+    return {"repo": repo_key, "framework": framework, **copy.deepcopy(PLACEHOLDER_BEST_PRACTICES)}
 
 
 @mcp.tool()
-def generate_pull_request_description(repo_key: str, review_id: str) -> Dict[str, Any]:
+@require_repo()
+def generate_pull_request_description(repo_key: str, repository_data: ReviewEntry, review_id: str) -> Dict[str, Any]:
     """
     Generate a comprehensive pull request description based on code review results
     
@@ -399,42 +993,15 @@ def generate_pull_request_description(repo_key: str, review_id: str) -> Dict[str
     Returns:
         Generated PR description with summary, changes, and testing notes
     """
-    if repo_key not in repo_data:
-        return {"error": "Repository data not found."}
-    
     # In a real implementation, this would generate a PR description based on the code changes
     # For this demo, we're returning placeholder data
     
-    return {
-        "repo": repo_key,
-        "pull_request_description": {
-            "title": "Refactor authentication service and fix security vulnerabilities",
-            "body": """
-## Changes
-
-This PR refactors the authentication service to improve security and maintainability:
-
-- Fix potential SQL injection vulnerability in login endpoint
-- Implement proper password hashing with bcrypt
-- Add rate limiting for failed login attempts
-- Refactor token generation for better testability
-
-## Testing
-
-- [x] Unit tests added for password hashing
-- [x] Integration tests for login flow
-- [x] Manual testing with various user roles
-
-## Reviewers
-
-Please pay special attention to the security changes in `src/services/auth.js`.
-            """
-        }
-    }
+    return {"repo": repo_key, **copy.deepcopy(PLACEHOLDER_PULL_REQUEST_DESCRIPTION)}
 
 
 @mcp.tool()
-def generate_cascade_prompt(repo_key: str) -> Dict[str, Any]:
+@require_repo()
+def generate_cascade_prompt(repo_key: str, repository_data: ReviewEntry) -> Dict[str, Any]:
     """
     Generate a Cascade-specific prompt based on the code review results
     
@@ -447,34 +1014,21 @@ def generate_cascade_prompt(repo_key: str) -> Dict[str, Any]:
     Returns:
         A structured Cascade prompt that can be used to implement the suggested improvements
     """
-    if repo_key not in repo_data:
-        return {"error": "Repository data not found."}
-    
-    repository_data = repo_data[repo_key]
-    review_results = repository_data.get("review_results", {})
-    
-    # Gather all the suggestions and issues from various analyses
-    all_improvements = []
-    
-    # Add code quality improvements
-    if "quality_metrics" in repository_data:
-        metrics = repository_data["quality_metrics"]
-        if "recommendations" in metrics:
-            all_improvements.extend(metrics["recommendations"])
-    
-    # Add security improvements
-    if "vulnerabilities" in repository_data:
-        for vuln in repository_data["vulnerabilities"]:
-            all_improvements.append(
-                f"Fix {vuln['severity']} security issue in {vuln['location']}: {vuln['description']} by {vuln['remediation']}"
-            )
-    
-    # Add performance improvements
-    if "performance_issues" in repository_data:
-        for issue in repository_data["performance_issues"]:
-            all_improvements.append(
-                f"Fix {issue['severity']} performance issue in {issue['location']}: {issue['description']} by {issue['suggestion']}"
-            )
+    review_results = repository_data.review_results
+    
+    # Gather all the suggestions and issues from various analyses in one pass:
+    # code quality recommendations, then security and performance fixes
+    all_improvements = list(itertools.chain(
+        (repository_data.quality_metrics or {}).get("recommendations", []),
+        (
+            f"Fix {vuln['severity']} security issue in {vuln['location']}: {vuln['description']} by {vuln['remediation']}"
+            for vuln in repository_data.vulnerabilities
+        ),
+        (
+            f"Fix {issue['severity']} performance issue in {issue['location']}: {issue['description']} by {issue['suggestion']}"
+            for issue in repository_data.performance_issues
+        )
+    ))
     
     # If no improvements were found, generate some generic ones based on repository name
     if not all_improvements:
@@ -525,8 +1079,7 @@ I need help implementing improvements to my GitHub repository ({repo_key}) based
 """
 
     # Add numbered list of improvements
-    for i, improvement in enumerate(all_improvements, 1):
-        cascade_prompt += f"{i}. {improvement}\n"
+    cascade_prompt += "".join(f"{i}. {improvement}\n" for i, improvement in enumerate(all_improvements, 1))
     
     cascade_prompt += """
 Please help me implement these changes one by one. For each change:
@@ -545,7 +1098,8 @@ Let's start with the first improvement, and we can work through the list systema
 
 
 @mcp.tool()
-def generate_improved_code(repo_key: str, file_path: str) -> Dict[str, Any]:
+@require_repo()
+def generate_improved_code(repo_key: str, repository_data: ReviewEntry, file_path: str) -> Dict[str, Any]:
     """
     Generate improved code for a specific file based on review results
     
@@ -558,18 +1112,13 @@ def generate_improved_code(repo_key: str, file_path: str) -> Dict[str, Any]:
     Returns:
         Improved code with explanations of changes
     """
-    if repo_key not in repo_data:
-        return {"error": "Repository data not found."}
-    
-    repository_data = repo_data[repo_key]
-    
     # Find the file in the code content
-    code_content = repository_data.get("code_content", {})
+    code_content = repository_data.code_content
     if file_path not in code_content:
         return {"error": f"File '{file_path}' not found in repository data."}
     
     file_data = code_content[file_path]
-    original_code = file_data.get("content", "")
+    original_code = file_data.content
     
     # Collect all issues related to this file
     file_issues = []
@@ -618,188 +1167,477 @@ Please show me the improved version with explanations for each change.
 
 
 # Helper functions
-def fetch_repo_info(owner: str, repo: str) -> Dict[str, Any]:
+@async_lru_cache(REPO_INFO_CACHE_SIZE, ttl=REPO_INFO_CACHE_TTL)
+async def fetch_repo_info(owner: str, repo: str) -> Dict[str, Any]:
     """Fetch repository information from GitHub API"""
     try:
-        response = requests.get(
-            f"https://api.github.com/repos/{owner}/{repo}",
-            headers=GITHUB_HEADERS
+        response = await cached_get(
+            f"{GITHUB_API_URL}/repos/{owner}/{repo}"
         )
         
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content)
         elif response.status_code == 403:
             # Rate limit exceeded
             return {
                 "error": "GitHub API rate limit exceeded. Please try again later or provide a GitHub token.",
-                "details": response.json().get("message", "No additional details")
+                "details": github_error_message(response)
             }
         elif response.status_code == 404:
             return {"error": f"Repository '{owner}/{repo}' not found. Check if the repository exists and is public."}
         else:
-            return {"error": f"Failed to fetch repository information: {response.status_code}", "details": response.json().get("message", "No additional details")}
+            return {"error": f"Failed to fetch repository information: {response.status_code}", "details": github_error_message(response)}
     except Exception as e:
         return {"error": f"Error fetching repository information: {str(e)}"}
 
 
-def fetch_repo_files(owner: str, repo: str, path: str = "") -> Dict[str, Any]:
-    """Fetch repository files from GitHub API"""
+async def fetch_head_sha(owner: str, repo: str, ref: str = "HEAD") -> Dict[str, Any]:
+    """Resolve a ref to its commit SHA from GitHub API; HEAD resolves the default branch"""
+    # A full commit SHA is already resolved
+    if FULL_SHA_PATTERN.fullmatch(ref):
+        return {"sha": ref}
     try:
-        response = requests.get(
-            f"https://api.github.com/repos/{owner}/{repo}/contents/{path}",
-            headers=GITHUB_HEADERS
+        # The sha media type returns just the commit SHA instead of the full commit
+        response = await cached_get(
+            f"{GITHUB_API_URL}/repos/{owner}/{repo}/commits/{quote(ref)}",
+            headers={"Accept": "application/vnd.github.sha"}
         )
         
-        if response.status_code != 200:
-            if response.status_code == 403:
-                return {
-                    "error": "GitHub API rate limit exceeded. Please try again later or provide a GitHub token.",
-                    "details": response.json().get("message", "No additional details")
-                }
-            elif response.status_code == 404:
-                return {"error": f"Path '{path}' not found in repository '{owner}/{repo}'."}
-            else:
-                return {"error": f"Failed to fetch repository contents: {response.status_code}", "details": response.json().get("message", "No additional details")}
+        if response.status_code == 200:
+            return {"sha": response.text.strip()}
+        elif response.status_code == 403:
+            return {
+                "error": "GitHub API rate limit exceeded. Please try again later or provide a GitHub token.",
+                "details": github_error_message(response)
+            }
+        elif response.status_code in (404, 422):
+            return {"error": f"Ref '{ref}' not found in repository '{owner}/{repo}'."}
+        else:
+            return {"error": f"Failed to fetch commit information: {response.status_code}", "details": github_error_message(response)}
+    except Exception as e:
+        return {"error": f"Error fetching commit information: {str(e)}"}
+
+
+@async_lru_cache(maxsize=TREE_CACHE_SIZE)
+async def fetch_repo_tree(owner: str, repo: str, sha: str, recursive: bool = True) -> Dict[str, Any]:
+    """Fetch the file tree of a commit or directory from GitHub API, recursively in a single request by default"""
+    try:
+        # A tree addressed by SHA never changes, so it is not kept in the ETag cache
+        response = await github_request(
+            "GET",
+            f"{GITHUB_API_URL}/repos/{owner}/{repo}/git/trees/{sha}",
+            params={"recursive": "1"} if recursive else None
+        )
+        
+        if response.status_code == 200:
+            return orjson.loads(response.content)
+        elif response.status_code == 403:
+            return {
+                "error": "GitHub API rate limit exceeded. Please try again later or provide a GitHub token.",
+                "details": github_error_message(response)
+            }
+        elif response.status_code == 404:
+            return {"error": f"Tree '{sha}' not found in repository '{owner}/{repo}'."}
+        else:
+            return {"error": f"Failed to fetch repository tree: {response.status_code}", "details": github_error_message(response)}
+    except Exception as e:
+        return {"error": f"Error fetching repository tree: {str(e)}"}
+
+
+async def walk_repo_tree(owner: str, repo: str, sha: str) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Walk a commit tree one directory at a time using a pool of concurrent workers
+    
+    Used when GitHub truncates the recursive listing of a very large repository.
+    Returns entries with full paths, in the same shape as a recursive listing, or the
+    error of the first directory that could not be listed.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    queue.put_nowait(("", sha))
+    entries = []
+    errors = []
+    
+    async def worker():
+        while True:
+            prefix, tree_sha = await queue.get()
+            try:
+                tree = await fetch_repo_tree(owner, repo, tree_sha, recursive=False)
+                if "error" in tree:
+                    # A directory that cannot be listed would silently drop its files from the review
+                    errors.append(tree)
+                    continue
+                for entry in tree.get("tree", []):
+                    if entry["type"] == "tree" and entry["path"] in IGNORED_DIRECTORIES:
+                        continue
+                    entry = {**entry, "path": prefix + entry["path"]}
+                    if entry["type"] == "tree":
+                        queue.put_nowait((entry["path"] + "/", entry["sha"]))
+                    entries.append(entry)
+            finally:
+                queue.task_done()
+    
+    workers = [asyncio.create_task(worker()) for _ in range(TREE_WALK_WORKERS)]
+    await queue.join()
+    for task in workers:
+        task.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    if errors:
+        return errors[0]
+    return entries
+
+
+async def fetch_repo_files(owner: str, repo: str, ref: str = "HEAD", max_total_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Fetch the code files of a ref (the default branch by default) using the Git Trees API, fetching raw file contents concurrently
+    
+    When max_total_size is given, only the files prepare_code_for_review would keep are fetched:
+    they are chosen from the tree sizes in review priority order until the total would exceed it.
+    """
+    try:
+        head = await fetch_head_sha(owner, repo, ref)
+        if "error" in head:
+            return head
+        
+        tree = await fetch_repo_tree(owner, repo, head["sha"])
+        if "error" in tree:
+            return tree
+        
+        entries = tree.get("tree", [])
+        if tree.get("truncated"):
+            # The recursive listing was cut short; list the tree directory by directory instead
+            entries = await walk_repo_tree(owner, repo, head["sha"])
+            if isinstance(entries, dict):
+                return entries
+        
+        ignore_spec = await fetch_ignore_spec(owner, repo, head["sha"], entries)
+        
+        candidates = []
+        for entry in entries:
+            # Filter out directories, non-code files and dependency/build output before fetching any content
+            if entry["type"] != "blob" or not is_code_file(entry["path"]) or is_ignored_path(entry["path"]):
+                continue
+            # Skip files that are committed but match the repository's own ignore rules
+            if ignore_spec is not None and ignore_spec.match_file(entry["path"]):
+                continue
+            candidates.append(entry)
+        
+        if max_total_size is not None:
+            # Select against the prompt budget up front so content that would be dropped is never downloaded
+            selected = []
+            selected_shas = set()
+            total_size = 0
+            for entry in sorted(candidates, key=lambda entry: review_priority(entry["path"])):
+                size = entry.get("size", 0)
+                if size > MAX_PROMPT_FILE_SIZE:
+                    continue
+                # Copies of a selected blob are sent once, so they do not count against the budget
+                if entry["sha"] not in selected_shas:
+                    if total_size + size > max_total_size:
+                        break
+                    total_size += size
+                    selected_shas.add(entry["sha"])
+                selected.append(entry)
+            candidates = selected
         
-        contents = response.json()
         result = {}
+        # Paths sharing a blob SHA have identical content, so each blob is fetched once for all of them
+        blob_paths: Dict[str, List[str]] = {}
+        for entry in candidates:
+            # Only fetch content for small files to avoid rate limiting and keep the cache bounded
+            if entry.get("size", 0) > MAX_FILE_SIZE:
+                result[entry["path"]] = FileEntry(
+                    path=entry["path"],
+                    content=f"File too large to fetch ({entry.get('size', 0)} bytes)",
+                    size=entry.get("size", 0),
+                    too_large=True
+                )
+                continue
+            blob_paths.setdefault(entry["sha"], []).append(entry["path"])
         
-        if isinstance(contents, list):
-            # This is a directory, process each item
-            for item in contents:
-                if item["type"] == "file":
-                    # Only fetch content for small files (<1MB) to avoid rate limiting
-                    if item.get("size", 0) < 1024 * 1024:
-                        file_content = fetch_file_content(owner, repo, item["path"])
-                        if "error" not in file_content:
-                            result[item["path"]] = file_content
-                    else:
-                        result[item["path"]] = {
-                            "content": f"File too large to fetch ({item.get('size', 0)} bytes)",
-                            "path": item["path"],
-                            "size": item.get("size", 0),
-                            "too_large": True
-                        }
-                elif item["type"] == "dir":
-                    # Only recurse a few levels deep to avoid rate limiting
-                    if path.count("/") < 3:
-                        sub_contents = fetch_repo_files(owner, repo, item["path"])
-                        if "error" not in sub_contents:
-                            result.update(sub_contents)
-        else:
-            # This is a single file
-            if contents["type"] == "file":
-                file_content = fetch_file_content(owner, repo, path)
-                if "error" not in file_content:
-                    result[path] = file_content
+        blob_cache = get_etag_cache()
+        # The first path of each blob stands in for the others while fetching
+        blob_shas = {shared_paths[0]: sha for sha, shared_paths in blob_paths.items()}
+        fetched = {}
+        paths = []
+        for path, sha in blob_shas.items():
+            # Blobs are content-addressed, so a blob seen in any earlier commit or fork is served from disk
+            cached = blob_cache.get(BLOB_CACHE_PREFIX + sha)
+            if cached is None:
+                paths.append(path)
+                continue
+            content, size, is_binary = cached
+            fetched[path] = FileEntry(path=path, content=content, size=size, is_binary=is_binary)
+        missing = set(paths)
+        
+        # GraphQL needs a token; it batches many files per request, falling back to raw fetches on failure
+        if GITHUB_API_TOKEN:
+            batches = [paths[i:i + GRAPHQL_BATCH_SIZE] for i in range(0, len(paths), GRAPHQL_BATCH_SIZE)]
+            batch_results = await asyncio.gather(*(fetch_files_graphql(owner, repo, head["sha"], batch) for batch in batches))
+            paths = []
+            for batch, batch_result in zip(batches, batch_results):
+                if "error" in batch_result:
+                    paths.extend(batch)
+                else:
+                    fetched.update(batch_result)
+                    paths.extend(path for path in batch if path not in batch_result)
+        
+        tasks = [fetch_file_content(owner, repo, path, head["sha"]) for path in paths]
+        for file_content in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(file_content, FileEntry):
+                fetched[file_content.path] = file_content
+        
+        for path, file_content in fetched.items():
+            sha = blob_shas[path]
+            if path in missing:
+                blob_cache[BLOB_CACHE_PREFIX + sha] = (file_content.content, file_content.size, file_content.is_binary)
+            for shared_path in blob_paths[sha]:
+                result[shared_path] = file_content if shared_path == path else replace(file_content, path=shared_path)
+        
+        # Evict the least recently used blobs so the on-disk cache stays bounded
+        touch_cache_index(
+            blob_cache, BLOB_INDEX_KEY, [BLOB_CACHE_PREFIX + blob_shas[path] for path in fetched], BLOB_CACHE_SIZE
+        )
         
         return result
     except Exception as e:
         return {"error": f"Error fetching repository files: {str(e)}"}
 
 
-def fetch_file_content(owner: str, repo: str, path: str) -> Dict[str, Any]:
-    """Fetch content of a specific file from GitHub API"""
+async def fetch_ignore_spec(owner: str, repo: str, ref: str, entries: List[Dict[str, Any]]) -> Optional[pathspec.GitIgnoreSpec]:
+    """Compile the root .gitignore of a commit into a path matcher, if the repository has one"""
+    if not any(entry["path"] == ".gitignore" and entry["type"] == "blob" for entry in entries):
+        return None
+    
+    gitignore = await fetch_file_content(owner, repo, ".gitignore", ref)
+    if not isinstance(gitignore, FileEntry) or gitignore.is_binary:
+        return None
+    return pathspec.GitIgnoreSpec.from_lines(gitignore.content.splitlines())
+
+
+async def fetch_file_content(owner: str, repo: str, path: str, ref: str) -> Union[FileEntry, Dict[str, Any]]:
+    """Fetch the raw content of a specific file at a given commit from raw.githubusercontent.com"""
     try:
-        response = requests.get(
-            f"https://api.github.com/repos/{owner}/{repo}/contents/{path}",
-            headers=GITHUB_HEADERS
-        )
+        # Content at a commit never changes and is kept in the blob cache, so it skips the ETag cache
+        response = await github_request("GET", f"{GITHUB_RAW_URL}/{owner}/{repo}/{ref}/{quote(path)}")
         
         if response.status_code == 200:
-            content_data = response.json()
-            if content_data.get("encoding") == "base64" and content_data.get("content"):
-                # Try to decode, but handle errors gracefully
-                try:
-                    decoded_content = base64.b64decode(content_data["content"]).decode("utf-8")
-                    return {
-                        "content": decoded_content,
-                        "path": path,
-                        "size": content_data.get("size", 0)
-                    }
-                except UnicodeDecodeError:
-                    # This is likely a binary file
-                    return {
-                        "content": "Binary file (cannot display content)",
-                        "path": path,
-                        "size": content_data.get("size", 0),
-                        "is_binary": True
-                    }
+            # Try to decode, but handle errors gracefully
+            try:
+                return FileEntry(path=path, content=response.content.decode("utf-8"), size=len(response.content))
+            except UnicodeDecodeError:
+                # This is likely a binary file
+                return FileEntry(
+                    path=path,
+                    content="Binary file (cannot display content)",
+                    size=len(response.content),
+                    is_binary=True
+                )
         
-        if response.status_code == 403:
+        # raw.githubusercontent.com answers with plain text rather than JSON errors
+        if response.status_code in (403, 429):
             return {
                 "error": "GitHub API rate limit exceeded. Please try again later or provide a GitHub token.",
-                "details": response.json().get("message", "No additional details")
+                "details": response.text or "No additional details"
             }
         elif response.status_code == 404:
             return {"error": f"File '{path}' not found in repository '{owner}/{repo}'."}
         
-        return {"error": f"Failed to fetch file content: {response.status_code}", "details": response.json().get("message", "No additional details")}
+        return {"error": f"Failed to fetch file content: {response.status_code}", "details": response.text or "No additional details"}
     except Exception as e:
         return {"error": f"Error fetching file content: {str(e)}"}
 
 
-def prepare_code_for_review(files: Dict[str, Any]) -> Dict[str, Any]:
-    """Prepare code content for review"""
+async def fetch_files_graphql(owner: str, repo: str, ref: str, paths: List[str]) -> Dict[str, Any]:
+    """
+    Fetch the contents of several files at a commit in a single GraphQL query
+    
+    Each path is requested through an aliased object(expression: "<ref>:<path>") field.
+    Files GitHub reports as truncated are left out so the caller can fetch them raw.
+    """
+    fields = "".join(
+        f"f{i}: object(expression: {json.dumps(f'{ref}:{path}')}) {{ ... on Blob {{ text isBinary isTruncated byteSize }} }}\n"
+        for i, path in enumerate(paths)
+    )
+    query = f"query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{\n{fields}}} }}"
+    try:
+        response = await github_request(
+            "POST",
+            f"{GITHUB_API_URL}/graphql",
+            json={"query": query, "variables": {"owner": owner, "name": repo}}
+        )
+        
+        if response.status_code != 200:
+            return {"error": f"Failed to fetch file contents via GraphQL: {response.status_code}"}
+        
+        data = orjson.loads(response.content)
+        repository = (data.get("data") or {}).get("repository")
+        if repository is None:
+            return {"error": "Failed to fetch file contents via GraphQL", "details": data.get("errors", "No additional details")}
+        
+        result = {}
+        for i, path in enumerate(paths):
+            blob = repository.get(f"f{i}")
+            if not blob or blob.get("isTruncated"):
+                continue
+            if blob.get("isBinary") or blob.get("text") is None:
+                result[path] = FileEntry(
+                    path=path,
+                    content="Binary file (cannot display content)",
+                    size=blob.get("byteSize", 0),
+                    is_binary=True
+                )
+            else:
+                result[path] = FileEntry(path=path, content=blob["text"], size=blob.get("byteSize", 0))
+        return result
+    except Exception as e:
+        return {"error": f"Error fetching file contents via GraphQL: {str(e)}"}
+
+
+def prepare_code_for_review(files: Dict[str, Any]) -> Dict[str, FileEntry]:
+    """
+    Prepare code content for review (files are already filtered to code files when fetched)
+    
+    Files are taken in priority order until the total prompt size limit is reached.
+    """
     processed_files = {}
-    for path, file_data in files.items():
-        # Skip binary files, large files, etc.
-        if isinstance(file_data, dict) and "content" in file_data:
-            # Filter to only include code files
-            if is_code_file(path):
-                processed_files[path] = file_data
+    total_size = 0
+    # Identical files (vendored copies, repeated boilerplate) are sent to Claude once, listing the other paths
+    seen: Dict[bytes, str] = {}
+    aliases: Dict[str, List[str]] = {}
+    for path in sorted(files, key=review_priority):
+        file_data = files[path]
+        # Skip entries without content
+        if not isinstance(file_data, FileEntry):
+            continue
+        # Skip files too large to be worth their token cost
+        size = file_data.size
+        if size > MAX_PROMPT_FILE_SIZE:
+            continue
+        digest = None
+        if not file_data.is_binary and not file_data.too_large:
+            digest = content_digest(file_data.content)
+            if digest in seen:
+                # Kept for the per-file tools, but left out of the prompt and the size budget
+                aliases.setdefault(seen[digest], []).append(path)
+                processed_files[path] = replace(file_data, duplicate_of=seen[digest])
+                continue
+        if total_size + size > MAX_PROMPT_SIZE:
+            break
+        total_size += size
+        processed_files[path] = file_data
+        if digest is not None:
+            seen[digest] = path
+    
+    # Copy rather than mutate, as file entries are shared with the fetch caches
+    for path, other_paths in aliases.items():
+        processed_files[path] = replace(processed_files[path], also_at=other_paths)
     
     return processed_files
 
 
+def review_priority(path: str) -> tuple:
+    """Sort key ranking source directories first, tests and examples last, then shorter paths"""
+    if PRIORITY_PATH_PATTERN.search(path):
+        rank = 0
+    elif LOW_PRIORITY_PATH_PATTERN.search(path):
+        rank = 2
+    else:
+        rank = 1
+    return (rank, len(path), path)
+
+
 def is_code_file(path: str) -> bool:
-    """Check if a file is a code file based on extension"""
-    code_extensions = [
-        ".py", ".js", ".ts", ".jsx", ".tsx", ".java", ".c", ".cpp", ".cs", 
-        ".go", ".rb", ".php", ".swift", ".kt", ".rs", ".html", ".css", ".scss"
-    ]
-    return any(path.endswith(ext) for ext in code_extensions)
+    """Check if a file is a code file based on extension, excluding minified bundles"""
+    if ".min." in path:
+        return False
+    return path.rpartition(".")[2].lower() in CODE_EXTS
 
 
-def create_review_prompt(code_content: Dict[str, Any], focus_areas: Optional[str] = None) -> str:
-    """Create a prompt for Claude to review the code"""
-    prompt = "Please review the following code repository:\n\n"
-    
-    # Add focus areas to prompt if specified
+def is_ignored_path(path: str) -> bool:
+    """Check if a file lives in a dependency, VCS or build output directory"""
+    return any(part in IGNORED_DIRECTORIES for part in path.split("/")[:-1])
+
+
+def content_digest(content: str) -> bytes:
+    """Hash file content for deduplication and content-keyed caching"""
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+
+
+def is_scannable(path: str, file_data: FileEntry) -> bool:
+    """Check if a fetched file is worth parsing or scanning: text, within the fetch size limit and not generated or vendored"""
+    if file_data.is_binary or file_data.too_large or file_data.size > MAX_FILE_SIZE:
+        return False
+    return ".min." not in path and not is_ignored_path(path)
+
+
+def create_code_context(code_content: Dict[str, FileEntry]) -> str:
+    """Create the code portion of the review prompt, sent to Claude as a cacheable block"""
+    # Join once at the end to keep construction linear in size
+    file_block = FILE_PROMPT_TEMPLATE.format
+    return "Please review the following code repository:\n\n" + "".join(
+        file_block(
+            f"{path} (also at: {', '.join(file_data.also_at)})" if file_data.also_at else path,
+            file_data.content
+        )
+        for path, file_data in code_content.items()
+        if file_data.duplicate_of is None
+    )
+
+
+def create_review_prompt(focus_areas: Optional[str] = None) -> str:
+    """Create the review instructions for Claude based on the focus areas"""
     if focus_areas:
-        prompt += f"Focus areas for review: {focus_areas}\n\n"
-    else:
-        prompt += "Please provide a general code review covering best practices, potential bugs, and performance issues.\n\n"
-    
-    # Add code files to prompt
-    for path, file_data in code_content.items():
-        prompt += f"File: {path}\n"
-        prompt += "```\n"
-        prompt += file_data.get("content", "")
-        prompt += "\n```\n\n"
-    
-    return prompt
+        return f"Focus areas for review: {focus_areas}"
+    return "Please provide a general code review covering best practices, potential bugs, and performance issues."
 
 
-def generate_review(prompt: str) -> Dict[str, Any]:
+def get_anthropic_client() -> anthropic.AsyncAnthropic:
+    """Return the shared Anthropic API client, creating it on first use"""
+    global anthropic_client
+    if anthropic_client is None:
+        anthropic_client = anthropic.AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+    return anthropic_client
+
+
+async def generate_review(code_context: str, review_prompt: str) -> Dict[str, Any]:
     """
     Generate a code review using Claude API
     
-    In a real implementation, this would call Claude's API
-    For this demo, we'll return a placeholder response
+    The code is sent as a system block marked for prompt caching, so re-reviewing the
+    same code with different focus areas reuses the cached prefix. The response is
+    streamed and accumulated into the review details. Without an ANTHROPIC_API_KEY
+    a placeholder response is returned.
     """
-    # In a real implementation, you'd send the prompt to Claude API
-    # and get back a detailed code review
+    if not ANTHROPIC_API_KEY:
+        # Placeholder for demonstration
+        return {
+            "summary": "Code review generated successfully",
+            "details": "This is a placeholder for the actual code review that would be generated by Claude."
+        }
     
-    # This is where you would make the actual call to Claude
-    # Placeholder for demonstration
-    return {
-        "summary": "Code review generated successfully",
-        "details": "This is a placeholder for the actual code review that would be generated by Claude."
-    }
+    try:
+        details = []
+        async with get_anthropic_client().messages.stream(
+            model=CLAUDE_MODEL,
+            max_tokens=CLAUDE_MAX_TOKENS,
+            system=[
+                {"type": "text", "text": "You are an expert code reviewer."},
+                {"type": "text", "text": code_context, "cache_control": {"type": "ephemeral"}}
+            ],
+            messages=[{"role": "user", "content": review_prompt}]
+        ) as stream:
+            async for text in stream.text_stream:
+                details.append(text)
+        
+        return {
+            "summary": "Code review generated successfully",
+            "details": "".join(details)
+        }
+    except Exception as e:
+        return {"error": f"Error generating review: {str(e)}"}
 
 
-def generate_file_suggestions(file_content: Dict[str, Any], file_path: str) -> List[Dict[str, Any]]:
+def generate_file_suggestions(file_content: FileEntry, file_path: str) -> List[Dict[str, Any]]:
     """Generate improvement suggestions for a specific file"""
     # In a real implementation, this would call Claude with a specific prompt
     # for generating file-level improvement suggestions
@@ -814,7 +1652,7 @@ def generate_file_suggestions(file_content: Dict[str, Any], file_path: str) -> L
     ]
 
 
-def generate_repo_suggestions(repo_data: Dict[str, Any]) -> Dict[str, Any]:
+def generate_repo_suggestions(repo_data: ReviewEntry) -> Dict[str, Any]:
     """Generate improvement suggestions for an entire repository"""
     # In a real implementation, this would call Claude with a specific prompt
     # for generating repository-level improvement suggestions
@@ -834,78 +1672,90 @@ def generate_repo_suggestions(repo_data: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def analyze_repository_dependencies(repo_files: Dict[str, Any]) -> Dict[str, Any]:
+def parse_package_json(content: str) -> List[Dependency]:
+    """Parse the dependencies and dev dependencies of a package.json manifest"""
+    try:
+        manifest = orjson.loads(content or "{}")
+    except orjson.JSONDecodeError:
+        return []
+    
+    # One pass over both sections, tagging each with its dev flag
+    return [
+        Dependency(name, version, dev=dev)
+        for section, dev in (("dependencies", False), ("devDependencies", True))
+        for name, version in manifest.get(section, {}).items()
+    ]
+
+
+def parse_requirements(content: str) -> List[Dependency]:
+    """Parse the packages listed in a requirements.txt file"""
+    dependencies = []
+    for match in REQUIREMENT_PATTERN.finditer(content):
+        name, operator, version = match.groups()
+        if not operator:
+            version = "latest"
+        else:
+            # Clauses may be spaced out ("Django >= 3.2, < 4.0"); they are kept without the spaces
+            version = "".join(version.split())
+            if operator != "==" or "," in version:
+                version = operator + version
+        dependencies.append(Dependency(name, version))
+    return dependencies
+
+
+# Dependency manifests by file name, with the ecosystem they list and their parser
+DEPENDENCY_MANIFESTS = {
+    "package.json": ("javascript", parse_package_json),
+    "requirements.txt": ("python", parse_requirements),
+}
+
+
+def analyze_repository_dependencies(repo_files: Dict[str, FileEntry]) -> Dict[str, List[Dependency]]:
     """Analyze repository dependencies from package.json, requirements.txt, etc."""
+    manifests = [
+        (path, file_data) for path, file_data in repo_files.items()
+        if path.rpartition("/")[2] in DEPENDENCY_MANIFESTS and is_scannable(path, file_data)
+    ]
+    
+    # Repeat calls over the same manifests reuse the parsed result; records are frozen, so only the lists are copied
+    cache_key = tuple(sorted((path, content_digest(file_data.content)) for path, file_data in manifests))
+    if cache_key in dependency_cache:
+        dependency_cache.move_to_end(cache_key)
+        return {ecosystem: list(records) for ecosystem, records in dependency_cache[cache_key].items()}
+    
     dependencies = {
         "javascript": [],
         "python": [],
         "other": []
     }
     
-    for path, file_data in repo_files.items():
-        if path.endswith("package.json"):
-            # Parse JavaScript dependencies
-            try:
-                content = json.loads(file_data.get("content", "{}"))
-                deps = content.get("dependencies", {})
-                dev_deps = content.get("devDependencies", {})
-                
-                for name, version in deps.items():
-                    dependencies["javascript"].append({
-                        "name": name,
-                        "version": version,
-                        "dev": False
-                    })
-                
-                for name, version in dev_deps.items():
-                    dependencies["javascript"].append({
-                        "name": name,
-                        "version": version,
-                        "dev": True
-                    })
-            except json.JSONDecodeError:
-                pass
-                
-        elif path.endswith("requirements.txt"):
-            # Parse Python dependencies
-            content = file_data.get("content", "")
-            for line in content.split("\n"):
-                line = line.strip()
-                if line and not line.startswith("#"):
-                    parts = line.split("==")
-                    name = parts[0].strip()
-                    version = parts[1].strip() if len(parts) > 1 else "latest"
-                    dependencies["python"].append({
-                        "name": name,
-                        "version": version
-                    })
+    for path, file_data in manifests:
+        ecosystem, parse = DEPENDENCY_MANIFESTS[path.rpartition("/")[2]]
+        dependencies[ecosystem].extend(parse(file_data.content))
     
-    return dependencies
+    dependency_cache[cache_key] = dependencies
+    if len(dependency_cache) > DEPENDENCY_CACHE_SIZE:
+        dependency_cache.popitem(last=False)
+    return {ecosystem: list(records) for ecosystem, records in dependencies.items()}
 
 
-def find_security_issues(repo_files: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Find potential security issues in code (placeholder implementation)"""
-    security_issues = []
-    
+def find_security_issues(repo_files: Dict[str, FileEntry]) -> Iterator[SecurityFinding]:
+    """Find potential security issues in code (placeholder implementation), yielding each one as it is found"""
     # In a real implementation, this would use security analysis tools
     # For this demo, we're using very simple pattern matching
     
-    security_patterns = {
-        "sql_injection": [
-            r"SELECT.*FROM.*WHERE.*\+",
-            r"SELECT.*FROM.*WHERE.*\$",
-            r"executeQuery\(.*\+",
-        ],
-        "xss": [
-            r"innerHTML.*=",
-            r"document\.write\(",
-            r"eval\(",
-        ],
-        "hardcoded_secrets": [
-            r"apiKey.*=.*['|\"]",
-            r"password.*=.*['|\"]",
-            r"secret.*=.*['|\"]",
-        ]
-    }
-    
-    return security_issues
+    for path, file_data in repo_files.items():
+        if not is_scannable(path, file_data):
+            continue
+        content = file_data.content
+        # Most files contain none of the literals every pattern starts with, so skip the regex for them
+        folded = content.casefold()
+        if not any(keyword in folded for keyword in SECURITY_KEYWORDS):
+            continue
+        
+        # Matches arrive in order, so line numbers are counted incrementally
+        line, offset = 1, 0
+        for match in SECURITY_PATTERN.finditer(content):
+            line += content.count("\n", offset, match.start())
+            offset = match.start()
+            yield SecurityFinding(type=match.lastgroup, path=path, line=line, match=match.group().strip())
@@ -0,0 +1,31 @@
+import shelve
+
+import httpx
+import pytest
+
+import main
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Point the on-disk cache at a fresh file for the test and close it afterwards"""
+    monkeypatch.setattr(main, "GITHUB_CACHE_PATH", str(tmp_path / "cache"))
+    monkeypatch.setattr(main, "etag_cache", None)
+    yield
+    if isinstance(main.etag_cache, shelve.Shelf):
+        main.etag_cache.close()
+
+
+@pytest.fixture
+def github(monkeypatch):
+    """Route GitHub requests to a handler; returns the list of requests sent"""
+    requests = []
+    
+    def install(handler):
+        def record(request):
+            requests.append(request)
+            return handler(request)
+        monkeypatch.setattr(main, "http_client", httpx.AsyncClient(transport=httpx.MockTransport(record)))
+        return requests
+    
+    return install
@@ -0,0 +1,540 @@
+import asyncio
+import dbm
+import json
+import re
+import time
+import warnings
+
+import httpx
+import pytest
+
+import main
+from main import Dependency, parse_requirements
+
+
+def test_parse_requirements_versions():
+    content = (
+        "requests==2.31.0\nhttpx[http2]>=0.27\nDjango >= 3.2, < 4.0\nattrs==23.1 --hash=sha256:abc\n"
+        "rich\n# comment\norjson ; python_version >= '3.8'\n"
+    )
+    assert parse_requirements(content) == [
+        Dependency("requests", "2.31.0"),
+        Dependency("httpx", ">=0.27"),
+        Dependency("Django", ">=3.2,<4.0"),
+        Dependency("attrs", "23.1"),
+        Dependency("rich", "latest"),
+        Dependency("orjson", "latest"),
+    ]
+
+
+def test_parse_requirements_skips_option_url_and_vcs_lines():
+    content = "\n".join([
+        "-e .",
+        "-r dev-requirements.txt",
+        "--index-url https://pypi.example.com/simple",
+        "git+https://github.com/x/y.git",
+        "https://example.com/packages/pkg-1.0-py3-none-any.whl",
+        "./vendor/local-package",
+        "flask>=3.0",
+    ])
+    assert parse_requirements(content) == [Dependency("flask", ">=3.0")]
+
+
+def test_parse_requirements_direct_reference_and_crlf():
+    content = "pkg @ git+https://github.com/x/pkg.git\r\nnumpy\r\n"
+    assert parse_requirements(content) == [Dependency("pkg", "latest"), Dependency("numpy", "latest")]
+
+
+def test_fetch_repo_files_downloads_shared_blob_once(cache, github, monkeypatch):
+    monkeypatch.setattr(main, "GITHUB_API_TOKEN", "")
+    sha = "a" * 40
+    tree = {"tree": [
+        {"path": "src/a.py", "type": "blob", "sha": "b" * 40, "size": 6},
+        {"path": "lib/b.py", "type": "blob", "sha": "b" * 40, "size": 6},
+    ]}
+    
+    def handler(request):
+        if request.url.path.endswith("/git/trees/" + sha):
+            return httpx.Response(200, json=tree)
+        return httpx.Response(200, content=b"x = 1\n", headers={"ETag": "\"blob\""})
+    
+    requests = github(handler)
+    files = asyncio.run(main.fetch_repo_files("owner", "repo", ref=sha))
+    
+    assert files["src/a.py"].content == files["lib/b.py"].content == "x = 1\n"
+    assert files["lib/b.py"].path == "lib/b.py"
+    assert sum(request.url.host == "raw.githubusercontent.com" for request in requests) == 1
+    # Raw blobs go to the blob cache only, not the ETag cache as well
+    assert not any(key.startswith(main.GITHUB_RAW_URL) for key in main.get_etag_cache())
+
+
+def test_summaries_return_copies(cache):
+    store = main.RepoStore(maxsize=4)
+    entry = main.ReviewEntry(repo_info={}, review_results={}, focus_areas=None, review_date="2026-01-01T00:00:00")
+    
+    async def scenario():
+        await store.set("owner/repo", entry)
+        (row,) = await store.summaries()
+        row["focus_areas"] = "changed"
+        return await store.summaries()
+    
+    assert asyncio.run(scenario()) == [{"repo": "owner/repo", "review_date": "2026-01-01T00:00:00", "focus_areas": "General review"}]
+
+
+def test_reviews_persist_across_restart(cache):
+    entry = main.ReviewEntry(
+        repo_info={"name": "repo"},
+        review_results={"summary": "ok"},
+        focus_areas="security",
+        review_date="2026-01-01T00:00:00",
+        code_content={"a.py": main.FileEntry(path="a.py", content="x = 1\n", size=6)},
+        head_sha="c" * 40,
+    )
+    asyncio.run(main.RepoStore(maxsize=4).set("owner/repo", entry))
+    main.etag_cache.close()
+    main.etag_cache = None
+    
+    # A new store, as after a restart, lists the review from the index and reads it back on access
+    store = main.RepoStore(maxsize=4)
+    assert asyncio.run(store.summaries()) == [
+        {"repo": "owner/repo", "review_date": "2026-01-01T00:00:00", "focus_areas": "security"}
+    ]
+    assert store.get("owner/repo") == entry
+    assert store.get("owner/other") is None
+
+
+def test_placeholder_review_is_not_reused(cache, github, monkeypatch):
+    sha = "d" * 40
+    
+    def handler(request):
+        path = request.url.path
+        if path == "/repos/owner/placeholder":
+            return httpx.Response(200, json={"name": "placeholder"})
+        if path == "/repos/owner/placeholder/commits/HEAD":
+            return httpx.Response(200, text=sha)
+        if path == f"/repos/owner/placeholder/git/trees/{sha}":
+            return httpx.Response(200, json={"tree": [{"path": "a.py", "type": "blob", "sha": "e" * 40, "size": 6}]})
+        return httpx.Response(200, content=b"x = 1\n")
+    
+    github(handler)
+    monkeypatch.setattr(main, "repo_data", main.RepoStore(maxsize=4))
+    monkeypatch.setattr(main, "GITHUB_API_TOKEN", "")
+    monkeypatch.setattr(main, "ANTHROPIC_API_KEY", "")
+    url = "https://github.com/owner/placeholder"
+    asyncio.run(main.review_repository(url))
+    assert main.repo_data.get("owner/placeholder").model is None
+    
+    calls = []
+    
+    async def generate_review(code_context, review_prompt):
+        calls.append(review_prompt)
+        return {"summary": "Code review generated successfully", "details": "real"}
+    
+    monkeypatch.setattr(main, "ANTHROPIC_API_KEY", "key")
+    monkeypatch.setattr(main, "generate_review", generate_review)
+    assert asyncio.run(main.review_repository(url))["review"]["details"] == "real"
+    # The real review is reused for the same head and focus areas
+    assert asyncio.run(main.review_repository(url))["review"]["details"] == "real"
+    assert len(calls) == 1
+
+
+def test_review_repository_accepts_surrounding_whitespace(monkeypatch):
+    async def fetch_repo_info(owner, repo):
+        return {"error": f"{owner}/{repo}"}
+    
+    async def fetch_head_sha(owner, repo):
+        return {"sha": "f" * 40}
+    
+    monkeypatch.setattr(main, "fetch_repo_info", fetch_repo_info)
+    monkeypatch.setattr(main, "fetch_head_sha", fetch_head_sha)
+    assert asyncio.run(main.review_repository("  https://github.com/owner/repo.git\n")) == {"error": "owner/repo"}
+
+
+def test_github_error_message():
+    assert main.github_error_message(httpx.Response(404, content=b'{"message": "Not \\"Found\\""}')) == 'Not "Found"'
+    assert main.github_error_message(httpx.Response(502, content=b"<html>Bad gateway</html>")) == "No additional details"
+    assert main.github_error_message(httpx.Response(403, content=b'{"message": "bad \\q escape"}')) == "Forbidden"
+
+
+SECURITY_SAMPLES = {
+    "sql_injection": [
+        'query = "SELECT * FROM users WHERE id = " + user_id',
+        'db.query(`SELECT name FROM t WHERE id = ${id}`)',
+        "stmt.executeQuery(base + filter)",
+    ],
+    "xss": ["el.innerHTML = html", "document.write(data)", "eval(code)"],
+    "hardcoded_secrets": ['apiKey = "abc123"', "PASSWORD = 'hunter2'", 'client_secret = "s3cret"'],
+}
+
+
+@pytest.mark.parametrize("issue_type,line", [
+    (issue_type, line) for issue_type, lines in SECURITY_SAMPLES.items() for line in lines
+])
+def test_security_pattern_matches(issue_type, line):
+    assert main.SECURITY_PATTERN.search(line).lastgroup == issue_type
+    # Every match must also get past the keyword check that skips files before the regex runs
+    assert any(keyword in line.casefold() for keyword in main.SECURITY_KEYWORDS)
+
+
+def test_security_keywords_cover_every_pattern():
+    for patterns in main.SECURITY_PATTERNS.values():
+        for pattern in patterns:
+            assert main.security_keyword(pattern) in main.SECURITY_KEYWORDS
+    assert main.security_keyword(r"document\.write\(") == "document.write("
+    assert main.security_keyword(r"SELECT\b[^\n]{0,300}?FROM") == "select"
+
+
+@pytest.mark.parametrize("pattern", [r"eval\(|exec\(", r"(?:eval|exec)\(", r"[a-z]+\(", r"\beval\("])
+def test_security_keyword_is_empty_without_a_common_prefix(pattern):
+    assert main.security_keyword(pattern) == ""
+
+
+
+def test_cached_get_revalidates_with_etag(cache, github):
+    def handler(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=b'{"name": "repo"}', headers={"ETag": '"v1"'})
+    
+    requests = github(handler)
+    url = f"{main.GITHUB_API_URL}/repos/owner/etag"
+    first = asyncio.run(main.cached_get(url))
+    second = asyncio.run(main.cached_get(url))
+    
+    assert first.status_code == second.status_code == 200
+    assert second.content == b'{"name": "repo"}'
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+
+
+def test_cached_get_evicts_least_recently_used(cache, github, monkeypatch):
+    monkeypatch.setattr(main, "ETAG_CACHE_SIZE", 2)
+    github(lambda request: httpx.Response(200, content=b"{}", headers={"ETag": '"v1"'}))
+    urls = [f"{main.GITHUB_API_URL}/repos/owner/repo{i}" for i in range(3)]
+    for url in urls:
+        asyncio.run(main.cached_get(url))
+    
+    cache = main.get_etag_cache()
+    assert urls[0] not in cache
+    assert urls[1] in cache and urls[2] in cache
+
+
+def test_trees_skip_the_etag_cache(cache, github):
+    github(lambda request: httpx.Response(200, json={"tree": []}, headers={"ETag": '"tree"'}))
+    assert asyncio.run(main.fetch_repo_tree("owner", "etag-tree", "1" * 40)) == {"tree": []}
+    assert not any("/git/trees/" in key for key in main.get_etag_cache())
+
+
+def test_etag_cache_falls_back_to_memory_when_locked(cache, monkeypatch):
+    def locked(path):
+        raise dbm.error[0]("locked by another process")
+    
+    monkeypatch.setattr(main.shelve, "open", locked)
+    assert main.get_etag_cache() == {}
+
+
+def truncated_tree_handler(root, failing_sha=None):
+    """Serve a truncated recursive listing of root, with src/ listed one directory at a time"""
+    def handler(request):
+        sha = request.url.path.rpartition("/")[2]
+        if sha == failing_sha:
+            return httpx.Response(403, json={"message": "API rate limit exceeded"})
+        if sha == root and "recursive" in request.url.params:
+            return httpx.Response(200, json={"tree": [], "truncated": True})
+        if sha == root:
+            return httpx.Response(200, json={"tree": [
+                {"path": "src", "type": "tree", "sha": "2" * 40},
+                {"path": "node_modules", "type": "tree", "sha": "3" * 40},
+                {"path": "main.py", "type": "blob", "sha": "4" * 40, "size": 1},
+            ]})
+        if sha == "2" * 40:
+            return httpx.Response(200, json={"tree": [{"path": "app.py", "type": "blob", "sha": "5" * 40, "size": 1}]})
+        return httpx.Response(200, content=b"x")
+    return handler
+
+
+def test_fetch_repo_files_walks_truncated_tree(cache, github, monkeypatch):
+    monkeypatch.setattr(main, "GITHUB_API_TOKEN", "")
+    root = "6" * 40
+    requests = github(truncated_tree_handler(root))
+    files = asyncio.run(main.fetch_repo_files("owner", "walk", ref=root))
+    
+    assert sorted(files) == ["main.py", "src/app.py"]
+    # Ignored directories are not listed
+    assert not any(request.url.path.endswith("3" * 40) for request in requests)
+
+
+def test_walk_repo_tree_reports_unlisted_directories(cache, github, monkeypatch):
+    monkeypatch.setattr(main, "GITHUB_API_TOKEN", "")
+    monkeypatch.setattr(main, "GITHUB_MAX_RETRIES", 0)
+    root = "7" * 40
+    github(truncated_tree_handler(root, failing_sha="2" * 40))
+    files = asyncio.run(main.fetch_repo_files("owner", "walk-error", ref=root))
+    
+    assert files["error"].startswith("GitHub API rate limit exceeded")
+
+
+def test_prepare_code_for_review_keeps_priority_files_within_budget(monkeypatch):
+    monkeypatch.setattr(main, "MAX_PROMPT_FILE_SIZE", 10)
+    monkeypatch.setattr(main, "MAX_PROMPT_SIZE", 15)
+    files = {
+        path: main.FileEntry(path=path, content=str(i) * size, size=size)
+        for i, (path, size) in enumerate([
+            ("tests/test_app.py", 5),
+            ("src/app.py", 8),
+            ("big.py", 11),
+            ("setup.py", 6),
+            ("lib/util.py", 5),
+        ])
+    }
+    prepared = main.prepare_code_for_review(files)
+    
+    # src/ and lib/ come first; the oversized file is skipped and collection stops at the budget
+    assert list(prepared) == ["src/app.py", "lib/util.py"]
+
+
+def test_fetch_repo_files_skips_gitignored_files(cache, github, monkeypatch):
+    monkeypatch.setattr(main, "GITHUB_API_TOKEN", "")
+    sha = "8" * 40
+    tree = {"tree": [
+        {"path": ".gitignore", "type": "blob", "sha": "9" * 40, "size": 18},
+        {"path": "generated/api.py", "type": "blob", "sha": "a" * 40, "size": 1},
+        {"path": "app.py", "type": "blob", "sha": "b" * 40, "size": 1},
+    ]}
+    
+    def handler(request):
+        if request.url.path.endswith("/git/trees/" + sha):
+            return httpx.Response(200, json=tree)
+        if request.url.path.endswith("/.gitignore"):
+            return httpx.Response(200, content=b"generated/\n!keep.py\n")
+        return httpx.Response(200, content=b"x")
+    
+    github(handler)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        files = asyncio.run(main.fetch_repo_files("owner", "ignored", ref=sha))
+    assert list(files) == ["app.py"]
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the delays github_request waits for instead of sleeping"""
+    delays = []
+    
+    async def sleep(delay):
+        delays.append(delay)
+    
+    monkeypatch.setattr(main.asyncio, "sleep", sleep)
+    monkeypatch.setattr(main, "rate_limit_resume_at", 0.0)
+    return delays
+
+
+def sequence(*responses):
+    """Handler answering each request with the next response in order"""
+    pending = list(responses)
+    return lambda request: pending.pop(0)
+
+
+def test_github_request_retries_server_errors(github, sleeps):
+    requests = github(sequence(httpx.Response(502), httpx.Response(503), httpx.Response(200)))
+    response = asyncio.run(main.github_request("GET", f"{main.GITHUB_API_URL}/rate"))
+    
+    assert response.status_code == 200
+    assert len(requests) == 3
+    assert sleeps == [main.GITHUB_RETRY_BACKOFF, main.GITHUB_RETRY_BACKOFF * 2]
+
+
+def test_github_request_waits_for_retry_after(github, sleeps):
+    requests = github(sequence(httpx.Response(429, headers={"Retry-After": "2"}), httpx.Response(200)))
+    response = asyncio.run(main.github_request("GET", f"{main.GITHUB_API_URL}/rate"))
+    
+    assert response.status_code == 200
+    assert len(requests) == 2
+    assert sleeps == [2.0]
+
+
+def test_github_request_gives_up_on_long_waits(github, sleeps):
+    requests = github(sequence(httpx.Response(403, headers={"Retry-After": "3600"})))
+    response = asyncio.run(main.github_request("GET", f"{main.GITHUB_API_URL}/rate"))
+    
+    assert response.status_code == 403
+    assert len(requests) == 1
+    assert sleeps == []
+
+
+def test_github_request_ignores_unreadable_rate_limit_headers(github, sleeps):
+    headers = {"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT", "X-RateLimit-Remaining": "n/a"}
+    requests = github(sequence(httpx.Response(403, headers=headers)))
+    response = asyncio.run(main.github_request("GET", f"{main.GITHUB_API_URL}/rate"))
+    
+    assert response.status_code == 403
+    assert len(requests) == 1
+    assert main.rate_limit_resume_at == 0.0
+
+
+def test_fetch_repo_files_batches_graphql_and_falls_back_to_raw(cache, github, monkeypatch):
+    monkeypatch.setattr(main, "GITHUB_API_TOKEN", "token")
+    monkeypatch.setattr(main, "GRAPHQL_BATCH_SIZE", 2)
+    sha = "c" * 40
+    paths = ["a.py", "b.py", "c.py", "d.py"]
+    tree = {"tree": [
+        {"path": path, "type": "blob", "sha": str(i) * 40, "size": 1} for i, path in enumerate(paths)
+    ]}
+    
+    def handler(request):
+        if request.url.path.endswith("/git/trees/" + sha):
+            return httpx.Response(200, json=tree)
+        if request.url.path == "/graphql":
+            query = json.loads(request.content)["query"]
+            fields = dict(re.findall(r'(f\d+): object\(expression: "[0-9a-f]+:([^"]+)"\)', query))
+            if "c.py" in fields.values():
+                # The whole second batch fails and is fetched raw
+                return httpx.Response(200, json={"data": None, "errors": [{"message": "boom"}]})
+            return httpx.Response(200, json={"data": {"repository": {
+                alias: {"text": f"# {path}", "isBinary": False, "isTruncated": path == "b.py", "byteSize": 5}
+                for alias, path in fields.items()
+            }}})
+        return httpx.Response(200, content=f"raw {request.url.path.rpartition('/')[2]}".encode())
+    
+    requests = github(handler)
+    files = asyncio.run(main.fetch_repo_files("owner", "graphql", ref=sha))
+    
+    assert {path: file_data.content for path, file_data in files.items()} == {
+        "a.py": "# a.py",
+        "b.py": "raw b.py",
+        "c.py": "raw c.py",
+        "d.py": "raw d.py",
+    }
+    assert sum(request.url.path == "/graphql" for request in requests) == 2
+
+
+def test_concurrent_fetches_keep_each_others_blobs_indexed(cache, github, monkeypatch):
+    monkeypatch.setattr(main, "GITHUB_API_TOKEN", "")
+    trees = {
+        "d" * 40: {"tree": [{"path": "one.py", "type": "blob", "sha": "e" * 40, "size": 1}]},
+        "f" * 40: {"tree": [{"path": "two.py", "type": "blob", "sha": "0" * 40, "size": 1}]},
+    }
+    
+    def handler(request):
+        sha = request.url.path.rpartition("/")[2]
+        if sha in trees:
+            return httpx.Response(200, json=trees[sha])
+        return httpx.Response(200, content=b"x")
+    
+    github(handler)
+    
+    async def scenario():
+        await asyncio.gather(*(main.fetch_repo_files("owner", "concurrent", ref=sha) for sha in trees))
+    
+    asyncio.run(scenario())
+    index = main.get_etag_cache()[main.BLOB_INDEX_KEY]
+    assert set(index) == {main.BLOB_CACHE_PREFIX + "e" * 40, main.BLOB_CACHE_PREFIX + "0" * 40}
+
+
+def test_blob_cache_evicts_least_recently_used(cache, github, monkeypatch):
+    monkeypatch.setattr(main, "GITHUB_API_TOKEN", "")
+    monkeypatch.setattr(main, "BLOB_CACHE_SIZE", 1)
+    tree_sha = "9" * 40
+    tree = {"tree": [
+        {"path": "a.py", "type": "blob", "sha": "1" * 40, "size": 1},
+        {"path": "b.py", "type": "blob", "sha": "2" * 40, "size": 1},
+    ]}
+    github(lambda request: httpx.Response(200, json=tree) if request.url.path.endswith(tree_sha) else httpx.Response(200, content=b"x"))
+    asyncio.run(main.fetch_repo_files("owner", "evict", ref=tree_sha))
+    
+    assert sum(key.startswith(main.BLOB_CACHE_PREFIX) for key in main.get_etag_cache()) == 1
+
+
+def test_identical_files_are_sent_once():
+    files = {
+        path: main.FileEntry(path=path, content="same = 1\n", size=9)
+        for path in ["src/util.py", "vendor_copy/util.py", "examples/util.py"]
+    }
+    files["src/app.py"] = main.FileEntry(path="src/app.py", content="app = 1\n", size=8)
+    prepared = main.prepare_code_for_review(files)
+    
+    assert prepared["src/util.py"].also_at == ["vendor_copy/util.py", "examples/util.py"]
+    assert prepared["examples/util.py"].duplicate_of == "src/util.py"
+    # Entries shared with the fetch caches are copied rather than changed
+    assert files["src/util.py"].also_at == []
+    
+    context = main.create_code_context(prepared)
+    assert context.count("same = 1") == 1
+    assert "File: src/util.py (also at: vendor_copy/util.py, examples/util.py)" in context
+
+
+def test_stored_reviews_from_other_versions(cache, monkeypatch):
+    entry = main.ReviewEntry(repo_info={}, review_results={}, focus_areas=None, review_date="2026-01-01T00:00:00")
+    asyncio.run(main.RepoStore(maxsize=4).set("owner/newer", entry))
+    asyncio.run(main.RepoStore(maxsize=4).set("owner/broken", entry))
+    cache = main.get_etag_cache()
+    newer = cache[main.REVIEW_CACHE_PREFIX + "owner/newer"]
+    newer["reviewer"] = "someone"
+    newer["code_content"] = {"a.py": {"path": "a.py", "content": "", "size": 0, "encoding": "utf-8"}}
+    cache[main.REVIEW_CACHE_PREFIX + "owner/newer"] = newer
+    cache[main.REVIEW_CACHE_PREFIX + "owner/broken"] = {"review_date": "2026-01-01T00:00:00"}
+    
+    store = main.RepoStore(maxsize=4)
+    # Unknown keys are ignored, and an entry missing required fields counts as not reviewed
+    assert store.get("owner/newer").code_content["a.py"].path == "a.py"
+    assert store.get("owner/broken") is None
+    monkeypatch.setattr(main, "repo_data", store)
+    assert main.get_review_details("owner/broken") == {"error": "Repository review not found."}
+
+
+def test_require_repo_hides_repository_data_from_tool_schema():
+    tools = {tool.name: tool for tool in asyncio.run(main.mcp.list_tools())}
+    
+    assert set(tools["suggest_improvements"].inputSchema["properties"]) == {"repo_key", "file_path"}
+    assert tools["suggest_improvements"].inputSchema["required"] == ["repo_key"]
+    assert set(tools["analyze_dependencies"].inputSchema["properties"]) == {"repo_key"}
+
+
+def test_placeholder_results_are_not_shared(monkeypatch):
+    store = main.RepoStore(maxsize=4)
+    monkeypatch.setattr(store, "get", lambda repo_key: main.ReviewEntry(
+        repo_info={}, review_results={}, focus_areas=None, review_date="2026-01-01T00:00:00"
+    ))
+    monkeypatch.setattr(main, "repo_data", store)
+    
+    first = main.analyze_dependencies("o/r")
+    first["dependencies"]["direct"] = 999
+    first["recommendations"].append("changed")
+    
+    second = main.analyze_dependencies("o/r")
+    assert second["dependencies"]["direct"] == 15
+    assert "changed" not in second["recommendations"]
+
+
+def test_find_security_issues():
+    files = {
+        "src/db.py": main.FileEntry(path="src/db.py", content='x = 1\nq = "SELECT a FROM b WHERE c = " + d\n', size=40),
+        "src/clean.py": main.FileEntry(path="src/clean.py", content="print('hello')\n", size=15),
+        "node_modules/x/index.js": main.FileEntry(path="node_modules/x/index.js", content="eval(x)", size=7),
+    }
+    findings = list(main.find_security_issues(files))
+    assert [(finding.type, finding.path, finding.line) for finding in findings] == [("sql_injection", "src/db.py", 2)]
+
+
+def test_security_pattern_is_bounded_on_pathological_lines():
+    line = "select from where " * 3000
+    start = time.perf_counter()
+    assert main.SECURITY_PATTERN.search(line) is None
+    assert time.perf_counter() - start < 2
+
+
+def test_analyze_repository_dependencies_reuses_parsed_result(monkeypatch):
+    monkeypatch.setattr(main, "dependency_cache", main.OrderedDict())
+    files = {
+        "package.json": main.FileEntry(path="package.json", content='{"devDependencies": {"jest": "^29"}}', size=36),
+        "api/requirements.txt": main.FileEntry(path="api/requirements.txt", content="flask==3.0\n", size=11),
+    }
+    first = main.analyze_repository_dependencies(files)
+    assert first == {
+        "javascript": [main.Dependency("jest", "^29", dev=True)],
+        "python": [main.Dependency("flask", "3.0")],
+        "other": [],
+    }
+    first["python"].clear()
+    # A hit returns fresh lists, so the caller's change does not reach the cache
+    assert main.analyze_repository_dependencies(files)["python"] == [main.Dependency("flask", "3.0")]
+    assert len(main.dependency_cache) == 1